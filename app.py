@@ -1,8 +1,22 @@
-import pygame
-import cv2
-from game.game_engine import GameEngine
-from game.renderer import Renderer
-from ml.gesture_detector import GestureDetector
+import argparse
+import asyncio
+import logging
+import time
+from game.startup_timer import StartupTimer
+
+# Started before the heavy imports so the report covers them too
+startup_timer = StartupTimer()
+
+with startup_timer.phase('import pygame+game'):
+    import pygame
+    from game.game_engine import GameEngine
+    from game.arena_engine import ArenaEngine, ArenaBot
+    from game.snake import OPPOSITE
+    from game.renderer import Renderer
+    from game.scheduler import FixedTimestep
+    from game.profiler import Profiler
+    from game.leaderboard import Leaderboard
+    from game.input_sources import KeyboardSource, GestureSource, BotSource, BotGroupSource, SocketSource
 
 # Constants
 WINDOW_WIDTH = 800
@@ -10,102 +24,407 @@ WINDOW_HEIGHT = 600
 GRID_SIZE = 20
 GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
 GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
-FPS = 5
+TICK_RATE = 5  # Snake moves per second
+FPS = 60  # Render and input polling rate
+PREVIEW_FPS = 15  # Default webcam preview refresh rate
+AUTOPILOT_RESTART = 2.0  # Seconds the game over screen shows before the autopilot plays again
+INPUT_QUEUE_SIZE = 256
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Snake with hand gesture control")
+    parser.add_argument('--keyboard-only', action='store_true',
+                        help="play with the keyboard only; never loads OpenCV, MediaPipe or the webcam")
+    parser.add_argument('--inference-size', metavar='WxH',
+                        help="resolution the hand model runs at, e.g. 320x240 (default: camera resolution)")
+    parser.add_argument('--roi-tracking', action='store_true',
+                        help="run the hand model on a crop around the last detected hand")
+    parser.add_argument('--inference-process', action='store_true',
+                        help="run gesture detection in a separate process so it never slows the game loop")
+    parser.add_argument('--latency-budget', type=float, metavar='MS',
+                        help="adapt camera resolution, frame skipping and model complexity to keep "
+                             "gesture detection under MS per frame; changes are logged")
+    parser.add_argument('--preview', choices=('thumbnail', 'window', 'off'), default='thumbnail',
+                        help="webcam preview: a thumbnail in the game window (default), "
+                             "a separate OpenCV window, or none")
+    parser.add_argument('--preview-fps', type=float, default=PREVIEW_FPS,
+                        help=f"webcam preview refresh rate (default: {PREVIEW_FPS})")
+    parser.add_argument('--preview-landmarks', action='store_true',
+                        help="draw the detected hand on the preview thumbnail")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print how long each startup phase took")
+    parser.add_argument('--profile', action='store_true',
+                        help="start with the profiling overlay on (toggle it in game with F3)")
+    parser.add_argument('--profile-export', metavar='PATH',
+                        help="on exit, write profiled stage timings as Chrome trace JSON, or CSV if PATH ends in .csv")
+    parser.add_argument('--record', metavar='PATH',
+                        help="record every turn and periodic snapshots of the game for replay")
+    parser.add_argument('--seed', type=int,
+                        help="seed the game's random food placement")
+    parser.add_argument('--player', default='PLAYER',
+                        help="name finished games are recorded under on the leaderboard")
+    parser.add_argument('--leaderboard', metavar='PATH', default='leaderboard.bin',
+                        help="high score log (default: leaderboard.bin)")
+    parser.add_argument('--autopilot', action='store_true',
+                        help="let the pathfinding bot steer, e.g. for demos; games go on the leaderboard as AUTOPILOT")
+    parser.add_argument('--input-socket', type=int, metavar='PORT',
+                        help="also accept directions, one per line, on a local TCP port")
+    parser.add_argument('--arena', type=int, metavar='K',
+                        help="arena mode: K snakes on one board, one each for the keyboard, gestures "
+                             "and the input socket, and bots for the rest")
+    args = parser.parse_args()
+    if args.arena is not None:
+        if args.arena < 2:
+            parser.error("--arena needs at least 2 snakes")
+        if args.autopilot or args.record:
+            parser.error("--arena cannot be combined with --autopilot or --record")
+    if args.latency_budget is not None and args.inference_process:
+        parser.error("--latency-budget cannot be combined with --inference-process")
+    return args
+
+class SnakeApp:
+    """
+    The game as a set of asyncio tasks: the simulation tick, rendering (which also
+    handles window events and menus), the webcam preview, every input source and a
+    dispatcher draining the shared input queue into the engine. Each task sleeps
+    until it is next due, so none of them can hold up another.
+    """
+
+    def __init__(self, game_engine, renderer, profiler, gesture_stack=None, report_pending=False,
+                 preview_fps=PREVIEW_FPS, leaderboard=None, player=None, auto_restart=None):
+        """auto_restart: seconds after a game over to start the next game by itself (None waits for a key)."""
+        self.game_engine = game_engine
+        self.renderer = renderer
+        self.profiler = profiler
+        self.gesture_stack = gesture_stack
+        self.report_pending = report_pending
+        self.preview_fps = preview_fps
+        self.leaderboard = leaderboard
+        self.player = player
+        self.auto_restart = auto_restart
+        self.scheduler = FixedTimestep(TICK_RATE)
+        self.in_menu = True
+        self.in_skins_menu = False
+        self.selected_menu_option = 0
+        self.selected_skin = 0
+        self.game_over_option = 0
+        self.first_frame = True
+        self.preview_drawn = 0  # thumbnail.updates when the preview was last drawn
+        self.stopped = None
+
+    @property
+    def playing(self):
+        return not self.in_menu and not self.in_skins_menu and not self.game_engine.game_over
+
+    def stop(self):
+        self.stopped.set()
+
+    async def run(self, sources):
+        """Run until the window is closed or a task fails; sources are InputSources."""
+        self.stopped = asyncio.Event()
+        queue = asyncio.Queue(maxsize=INPUT_QUEUE_SIZE)
+        coroutines = [self.tick_loop(), self.render_loop(), self.dispatch_inputs(queue)]
+        if self.gesture_stack is not None and self.gesture_stack.preview != 'off':
+            coroutines.append(self.preview_loop())
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        tasks += [asyncio.ensure_future(source.run(queue)) for source in sources]
+        stopped = asyncio.ensure_future(self.stopped.wait())
+        try:
+            done, _ = await asyncio.wait(tasks + [stopped], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for source in sources:
+                source.close()
+            for task in tasks + [stopped]:
+                task.cancel()
+            await asyncio.gather(*tasks, stopped, return_exceptions=True)
+        for task in done:
+            if task is not stopped and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+    async def dispatch_inputs(self, queue):
+        """Feed queued directions to the engine; input outside of play is dropped."""
+        while True:
+            source, direction = await queue.get()
+            if not self.playing:
+                continue
+            if source == GestureSource.name:
+                self.game_engine.handle_gesture(direction)
+            else:
+                self.game_engine.handle_direction(direction)
+
+    async def tick_loop(self):
+        """Advance the simulation at TICK_RATE while a game is in progress."""
+        scheduler = self.scheduler
+        while True:
+            if self.playing:
+                with self.profiler.stage('update'):
+                    for _ in range(scheduler.advance()):
+                        self.game_engine.update()
+                        if self.game_engine.game_over:
+                            if self.leaderboard is not None:
+                                self.leaderboard.submit(self.player, self.game_engine.score)
+                            break
+                await asyncio.sleep(scheduler.time_to_next_tick())
+            elif self.auto_restart is not None and self.game_engine.game_over and not self.in_menu:
+                await asyncio.sleep(self.auto_restart)
+                # Unless the player restarted or went back to the menu meanwhile
+                if self.game_engine.game_over and not self.in_menu:
+                    self.game_engine.reset_game()
+                    self.game_over_option = 0
+                scheduler.reset()
+            else:
+                scheduler.reset()
+                await asyncio.sleep(1 / FPS)
+
+    async def render_loop(self):
+        """Handle window events and draw one frame every 1/FPS seconds."""
+        frame_duration = 1 / FPS
+        next_frame = time.perf_counter()
+        while True:
+            self.profiler.frame()
+            with self.profiler.stage('events'):
+                events = pygame.event.get()
+            for event in events:
+                self.handle_event(event)
+
+            with self.profiler.stage('render'):
+                self.render()
+            if self.profiler.enabled:
+                with self.profiler.stage('overlay'):
+                    self.renderer.draw_profile_overlay(self.profiler)
+            # The thumbnail is only shown in play, and only pushed when it has a new frame;
+            # full frames redraw the last one themselves
+            gesture_stack = self.gesture_stack
+            thumbnail = gesture_stack.thumbnail if gesture_stack is not None else None
+            if thumbnail is not None and self.playing and thumbnail.updates != self.preview_drawn:
+                with self.profiler.stage('preview.blit'):
+                    self.renderer.draw_preview(thumbnail.surface)
+                self.preview_drawn = thumbnail.updates
+
+            if self.first_frame:
+                startup_timer.mark('first frame')
+                self.first_frame = False
+
+            if self.report_pending and (gesture_stack is None or gesture_stack.ready or gesture_stack.error):
+                print("Startup timing:\n" + startup_timer.report())
+                self.report_pending = False
+
+            # Pace frames without drifting; after falling behind, start over from now
+            next_frame += frame_duration
+            delay = next_frame - time.perf_counter()
+            if delay < 0:
+                next_frame = time.perf_counter()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def preview_loop(self):
+        """Refresh the webcam preview at preview_fps; closing the preview window quits the game."""
+        while True:
+            with self.profiler.stage('preview'):
+                if not self.gesture_stack.update_preview():
+                    self.stop()
+                    return
+            await asyncio.sleep(1 / self.preview_fps)
+
+    def render(self):
+        if self.in_skins_menu:
+            self.renderer.render_skins_menu(self.selected_skin)
+        else:
+            self.renderer.render(self.game_engine, show_menu=self.in_menu,
+                                 selected_menu_option=self.selected_menu_option,
+                                 game_over_option=self.game_over_option, alpha=self.scheduler.alpha,
+                                 leaderboard=self.leaderboard, player=self.player)
+
+    def apply_skin(self, skin_name):
+        self.game_engine._apply_skin(skin_name)
+
+    def handle_event(self, event):
+        game_engine = self.game_engine
+        if event.type == pygame.QUIT:
+            self.stop()
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                if not self.profiler.toggle():
+                    self.renderer.invalidate()
+            elif self.in_skins_menu:
+                if event.key == pygame.K_UP:
+                    self.selected_skin = (self.selected_skin - 1) % 3
+                elif event.key == pygame.K_DOWN:
+                    self.selected_skin = (self.selected_skin + 1) % 3
+                elif event.key == pygame.K_RETURN:
+                    skins_list = ['classic', 'neon', 'retro']
+                    self.apply_skin(skins_list[self.selected_skin])
+                    self.in_skins_menu = False
+                elif event.key == pygame.K_ESCAPE:
+                    self.in_skins_menu = False
+            elif game_engine.game_over:
+                if event.key == pygame.K_UP:
+                    self.game_over_option = (self.game_over_option - 1) % 2
+                elif event.key == pygame.K_DOWN:
+                    self.game_over_option = (self.game_over_option + 1) % 2
+                elif event.key == pygame.K_RETURN:
+                    if self.game_over_option == 0:
+                        game_engine.reset_game()
+                        self.game_over_option = 0
+                    elif self.game_over_option == 1:
+                        self.in_menu = True
+                        self.game_over_option = 0
+            elif self.in_menu:
+                if event.key == pygame.K_UP:
+                    self.selected_menu_option = (self.selected_menu_option - 1) % 2
+                elif event.key == pygame.K_DOWN:
+                    self.selected_menu_option = (self.selected_menu_option + 1) % 2
+                elif event.key == pygame.K_RETURN:
+                    if self.selected_menu_option == 0:
+                        self.in_menu = False
+                        game_engine.reset_game()
+                    elif self.selected_menu_option == 1:
+                        self.in_skins_menu = True
+                elif event.key == pygame.K_ESCAPE:
+                    self.stop()
+            else:
+                if event.key == pygame.K_ESCAPE:
+                    self.in_menu = True
+
+class ArenaApp(SnakeApp):
+    """
+    SnakeApp for an ArenaEngine: each input source steers the snake players maps
+    its name to, and every snake is drawn in its own color. Arena games are not
+    recorded on the leaderboard.
+    """
+
+    def __init__(self, arena, renderer, profiler, players, labels, gesture_stack=None,
+                 reverse_gesture_direction=False, **options):
+        """players: source name -> snake index. labels: score bar label of each snake."""
+        super().__init__(arena, renderer, profiler, gesture_stack, **options)
+        self.players = players
+        self.labels = labels
+        self.reverse_gesture_direction = reverse_gesture_direction
+
+    async def dispatch_inputs(self, queue):
+        while True:
+            source, direction = await queue.get()
+            snake = self.players.get(source)
+            if not self.playing or snake is None:
+                continue
+            if source == GestureSource.name and self.reverse_gesture_direction:
+                direction = OPPOSITE[direction]
+            self.game_engine.queue_direction(snake, direction)
+
+    def render(self):
+        if self.in_menu or self.in_skins_menu:
+            super().render()
+        else:
+            self.renderer.render_arena(self.game_engine, self.labels, game_over_option=self.game_over_option)
+
+    def apply_skin(self, skin_name):
+        pass  # Arena snakes are told apart by fixed colors
+
+def arena_players(arena, sources):
+    """
+    Give each human source its own snake, in order, and a bot to every snake left,
+    all driven by one BotGroupSource. Returns the sources to run, the source name
+    -> snake map and the snake labels.
+    """
+    names = {KeyboardSource.name: 'KEYS', GestureSource.name: 'HAND', SocketSource.name: 'NET'}
+    sources = sources[:arena.num_snakes]
+    labels = [names[source.name] for source in sources]
+    players = {source.name: i for i, source in enumerate(sources)}
+    bots = {}
+    for i in range(len(sources), arena.num_snakes):
+        bots[f'bot{i + 1}'] = ArenaBot(i)
+        players[f'bot{i + 1}'] = i
+        labels.append(f'BOT{i + 1}')
+    if bots:
+        sources.append(BotGroupSource(arena, bots))
+    return sources, players, labels
 
 def main():
-    pygame.init()
-    
+    args = parse_args()
+    if args.latency_budget is not None:
+        # Show the adaptive controller's decisions
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s: %(message)s')
+
+    with startup_timer.phase('pygame.init'):
+        pygame.init()
+
     # Set to True to reverse gesture direction
     REVERSE_GESTURE = True
-    
-    game_engine = GameEngine(GRID_WIDTH, GRID_HEIGHT, reverse_gesture_direction=REVERSE_GESTURE)
-    renderer = Renderer(WINDOW_WIDTH, WINDOW_HEIGHT, GRID_SIZE)
-    gesture_detector = GestureDetector()
-    
-    # Open webcam for gesture detection
-    cap = cv2.VideoCapture(0)
-    
-    clock = pygame.time.Clock()
-    running = True
-    in_menu = True
-    in_skins_menu = False
-    selected_menu_option = 0
-    selected_skin = 0
-    game_over_option = 0
-    
-    while running:
-        ret, frame = cap.read()
-        
-        if ret:
-            gesture, frame = gesture_detector.detect(frame)
-            if gesture and not in_menu and not in_skins_menu and not game_engine.game_over:
-                game_engine.handle_gesture(gesture)
-            
-            cv2.imshow('Gesture Detection', frame)
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if in_skins_menu:
-                    if event.key == pygame.K_UP:
-                        selected_skin = (selected_skin - 1) % 3
-                    elif event.key == pygame.K_DOWN:
-                        selected_skin = (selected_skin + 1) % 3
-                    elif event.key == pygame.K_RETURN:
-                        skins_list = ['classic', 'neon', 'retro']
-                        game_engine._apply_skin(skins_list[selected_skin])
-                        in_skins_menu = False
-                    elif event.key == pygame.K_ESCAPE:
-                        in_skins_menu = False
-                elif game_engine.game_over:
-                    if event.key == pygame.K_UP:
-                        game_over_option = (game_over_option - 1) % 2
-                    elif event.key == pygame.K_DOWN:
-                        game_over_option = (game_over_option + 1) % 2
-                    elif event.key == pygame.K_RETURN:
-                        if game_over_option == 0:
-                            game_engine.reset_game()
-                            game_over_option = 0
-                        elif game_over_option == 1:
-                            in_menu = True
-                            game_over_option = 0
-                elif in_menu:
-                    if event.key == pygame.K_UP:
-                        selected_menu_option = (selected_menu_option - 1) % 2
-                    elif event.key == pygame.K_DOWN:
-                        selected_menu_option = (selected_menu_option + 1) % 2
-                    elif event.key == pygame.K_RETURN:
-                        if selected_menu_option == 0:
-                            in_menu = False
-                            game_engine.reset_game()
-                        elif selected_menu_option == 1:
-                            in_skins_menu = True
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False
-                else:
-                    if event.key == pygame.K_ESCAPE:
-                        in_menu = True
-        
-        keys = pygame.key.get_pressed()
-        if not in_menu and not in_skins_menu and not game_engine.game_over:
-            game_engine.handle_input(keys)
-            game_engine.update()
-        
-        if in_skins_menu:
-            renderer.render_skins_menu(selected_skin)
+
+    # Stage timers stay in the loop; they cost next to nothing until profiling is on
+    profiler = Profiler(enabled=args.profile or bool(args.profile_export))
+
+    # Gesture backend loads in the background while the menu is already interactive
+    gesture_stack = None
+    if not args.keyboard_only:
+        from ml.gesture_stack import GestureStack
+        detector_options = {'roi_tracking': args.roi_tracking}
+        if args.inference_size:
+            width, height = args.inference_size.lower().split('x')
+            detector_options['inference_size'] = (int(width), int(height))
+        gesture_stack = GestureStack(startup_timer, detector_options=detector_options, profiler=profiler,
+                                     process_inference=args.inference_process, preview=args.preview,
+                                     preview_landmarks=args.preview_landmarks,
+                                     latency_budget=args.latency_budget)
+        gesture_stack.start()
+
+    with startup_timer.phase('create window'):
+        if args.arena:
+            game_engine = ArenaEngine(GRID_WIDTH, GRID_HEIGHT, args.arena, seed=args.seed)
         else:
-            renderer.render(game_engine, show_menu=in_menu, selected_menu_option=selected_menu_option, game_over_option=game_over_option)
-        
-        # Close webcam window if it's closed
-        if cv2.getWindowProperty('Gesture Detection', cv2.WND_PROP_VISIBLE) < 1:
-            running = False
-        
-        clock.tick(FPS)
-    
-    cap.release()
-    cv2.destroyAllWindows()
-    pygame.quit()
+            game_engine = GameEngine(GRID_WIDTH, GRID_HEIGHT, reverse_gesture_direction=REVERSE_GESTURE,
+                                     seed=args.seed)
+        recorder = None
+        if args.record:
+            from game.game_replay import GameRecorder
+            recorder = GameRecorder(args.record, game_engine)
+        renderer = Renderer(WINDOW_WIDTH, WINDOW_HEIGHT, GRID_SIZE)
+        if gesture_stack is not None:
+            # The thumbnail fills the score bar, clear of the board
+            gesture_stack.preview_height = renderer.bar_height
+
+    # Loads and writes on its own thread; the game over screen shows what is loaded
+    leaderboard = Leaderboard(args.leaderboard)
+    leaderboard.start()
+
+    # Every controller feeds the same input queue
+    sources = [KeyboardSource(1 / FPS)]
+    if gesture_stack is not None:
+        sources.append(GestureSource(gesture_stack, profiler=profiler))
+    if args.input_socket is not None:
+        sources.append(SocketSource(port=args.input_socket))
+    player = args.player
+    if args.autopilot:
+        from game.autopilot import Autopilot
+        sources.append(BotSource(game_engine, Autopilot()))
+        player = 'AUTOPILOT'
+
+    if args.arena:
+        sources, players, labels = arena_players(game_engine, sources)
+        app = ArenaApp(game_engine, renderer, profiler, players, labels, gesture_stack,
+                       reverse_gesture_direction=REVERSE_GESTURE, report_pending=args.startup_report,
+                       preview_fps=args.preview_fps)
+    else:
+        app = SnakeApp(game_engine, renderer, profiler, gesture_stack, report_pending=args.startup_report,
+                      preview_fps=args.preview_fps, leaderboard=leaderboard, player=player,
+                      auto_restart=AUTOPILOT_RESTART if args.autopilot else None)
+    try:
+        asyncio.run(app.run(sources))
+    finally:
+        if recorder is not None:
+            recorder.close()
+        leaderboard.close()
+        if leaderboard.error is not None:
+            print("Leaderboard unavailable:", leaderboard.error)
+        if args.profile_export:
+            print(f"Wrote {profiler.export(args.profile_export)} profile samples to {args.profile_export}")
+        if gesture_stack is not None:
+            gesture_stack.close()
+            if gesture_stack.error is not None:
+                print("Gesture control unavailable:", gesture_stack.error)
+            elif gesture_stack.pipeline is not None:
+                print("Gesture pipeline:", gesture_stack.pipeline.metrics.summary())
+                print("Gesture stages (ms):", gesture_stack.pipeline.timing_summary())
+        pygame.quit()
 
 if __name__ == "__main__":
     main()
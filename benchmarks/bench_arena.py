@@ -0,0 +1,94 @@
+"""
+Arena benchmark: tick rate of ArenaEngine as the number of snakes K grows.
+
+Every snake starts long: the board is covered by a serpentine path and each
+snake is laid along its own stretch of it, filling half the board between them.
+Each is then steered by an ArenaBot, so it keeps eating; dead snakes respawn at
+length 1, so K stays constant. Only ArenaEngine.update() is timed; with the
+shared occupancy grid its cost per snake should stay flat as K grows, however
+long the bodies are. "body cells" is the average total length of all snakes
+over the timed ticks.
+
+Usage: python benchmarks/bench_arena.py [ticks] [width] [height]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.arena_engine import ArenaBot, ArenaEngine
+from game.snake import Direction
+
+SNAKE_COUNTS = [1, 10, 50, 100, 200, 500]
+
+
+def serpentine(width, height):
+    """Cells of a boustrophedon path covering the board, starting at (0, 0)."""
+    for y in range(height):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        for x in xs:
+            yield (x, y)
+
+
+def lay_snakes(engine):
+    """
+    Replace the length-1 spawns with long snakes: snake i takes the first half of
+    the i-th of K equal stretches of a serpentine path, heading along it into the
+    empty second half. Food is moved onto the cells left free.
+    """
+    width = engine.play_width
+    for cell in list(engine.food) + [snake.body[0] for snake in engine.snakes]:
+        engine.grid[cell[1] * width + cell[0]] = 0
+        engine.free_cells.add(cell)
+    engine.food.clear()
+
+    path = list(serpentine(width, engine.play_height))
+    stride = len(path) // engine.num_snakes
+    length = max(1, stride // 2)
+    for i, snake in enumerate(engine.snakes):
+        cells = path[i * stride:i * stride + length + 1]
+        head, ahead = cells[length - 1], cells[-1]
+        snake.set_body(reversed(cells[:length]))
+        snake.direction = snake.next_direction = Direction((ahead[0] - head[0], ahead[1] - head[1]))
+        snake.direction_queue.clear()
+        for cell in cells[:length]:
+            engine.grid[cell[1] * width + cell[0]] = i + 1
+            engine.free_cells.remove(cell)
+    for _ in range(engine.num_food):
+        engine._spawn_food()
+
+
+def bench(num_snakes, width, height, ticks):
+    engine = ArenaEngine(width, height, num_snakes, seed=0, respawn=True)
+    lay_snakes(engine)
+    bots = [ArenaBot(i) for i in range(num_snakes)]
+    elapsed = 0.0
+    body_cells = 0
+    for _ in range(ticks):
+        for i, bot in enumerate(bots):
+            direction = bot(engine)
+            if direction is not None:
+                engine.queue_direction(i, direction)
+        start = time.perf_counter()
+        engine.update()
+        elapsed += time.perf_counter() - start
+        body_cells += sum(len(snake.body) for snake in engine.snakes)
+    return elapsed / ticks, sum(engine.deaths), body_cells / ticks
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    print(f"Board {width}x{height}, {ticks} ticks per K, respawning bot snakes")
+    print(f"{'K':>6} {'tick (ms)':>10} {'us/snake':>10} {'body cells':>11} {'avg len':>8} "
+          f"{'ticks/sec':>10} {'deaths':>8}")
+    for num_snakes in SNAKE_COUNTS:
+        tick, deaths, body_cells = bench(num_snakes, width, height, ticks)
+        print(f"{num_snakes:>6} {tick * 1e3:>10.3f} {tick * 1e6 / num_snakes:>10.2f} {body_cells:>11,.0f} "
+              f"{body_cells / num_snakes:>8.1f} {1 / tick:>10,.0f} {deaths:>8}")
+
+
+if __name__ == '__main__':
+    main()
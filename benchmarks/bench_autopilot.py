@@ -0,0 +1,41 @@
+"""
+Autopilot benchmark: headless games driven by the pathfinding bot.
+
+Runs the same seeded engine with plan reuse on and off (a fresh search every
+tick) and reports decisions per second, searches per decision, overall ticks per
+second including the engine, and the scores of finished rounds.
+
+Usage: python benchmarks/bench_autopilot.py [ticks] [grid_width] [grid_height]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.autopilot import Autopilot, play
+from game.game_engine import GameEngine
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    grid_width = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    grid_height = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    for reuse in (True, False):
+        engine = GameEngine(grid_width, grid_height, seed=0)
+        autopilot = Autopilot(reuse=reuse)
+        start = time.perf_counter()
+        scores = play(engine, autopilot, ticks)
+        elapsed = time.perf_counter() - start
+        cells = engine.play_width * engine.play_height
+        finished = ", ".join(f"{score} ({score // 10 + 1}/{cells} cells)" for score in scores) or "none"
+        print(f"{'reuse' if reuse else 'search every tick'}: "
+              f"{autopilot.decisions_per_second:,.0f} decisions/sec, "
+              f"{autopilot.searches / autopilot.decisions:.2f} searches/decision, "
+              f"{ticks / elapsed:,.0f} ticks/sec with the engine")
+        print(f"  finished rounds: {finished}; current score {engine.score}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput benchmark for BatchGameEngine: game steps per second for several batch sizes.
+
+Every game takes a random action each tick; finished games are reset in place so the
+batch stays full.
+
+With --verify, runs the same random actions through one GameEngine per game instead
+and checks every tick that body, food, score and game over match. The two engines draw
+food from different random generators, so each GameEngine is given the batch's food
+after checking that it landed on one of its own free cells.
+
+Usage: python benchmarks/bench_batch_engine.py [steps]
+       python benchmarks/bench_batch_engine.py --verify [steps] [games]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.batch_engine import BatchGameEngine, DIRECTIONS, NO_ACTION
+from game.game_engine import GameEngine
+
+GRID_WIDTH = 40
+GRID_HEIGHT = 30
+
+
+def bench(num_games, steps):
+    engine = BatchGameEngine(num_games, GRID_WIDTH, GRID_HEIGHT, seed=0)
+    rng = np.random.default_rng(1)
+    actions = rng.integers(-1, 4, size=(steps, num_games), dtype=np.int8)
+
+    start = time.perf_counter()
+    for t in range(steps):
+        _, dones = engine.step(actions[t])
+        if dones.any():
+            engine.reset(dones)
+    elapsed = time.perf_counter() - start
+    return num_games * steps / elapsed
+
+
+def mismatch(engine, batch, game, done):
+    """Describe how one GameEngine differs from its batch game, or None if they agree."""
+    body = list(engine.snake.body)
+    if body != batch.snake_body(game):
+        return f"body {body} != {batch.snake_body(game)}"
+    if engine.score != batch.score[game]:
+        return f"score {engine.score} != {batch.score[game]}"
+    if engine.game_over != done or engine.board_full != batch.board_full[game]:
+        return f"game over {engine.game_over}/{engine.board_full} != {done}/{batch.board_full[game]}"
+    food = batch.food_position(game)
+    if (food is None) != (engine.food.position is None) or (food is not None and food not in engine.free_cells):
+        return f"food {food} is not free in GameEngine"
+    return None
+
+
+def verify(num_games, steps):
+    """Differential check of BatchGameEngine against GameEngine. Returns the mismatch count."""
+    batch = BatchGameEngine(num_games, GRID_WIDTH, GRID_HEIGHT, seed=0)
+    engines = [GameEngine(GRID_WIDTH, GRID_HEIGHT, seed=game) for game in range(num_games)]
+    for game, engine in enumerate(engines):
+        engine.food.position = batch.food_position(game)
+    rng = np.random.default_rng(1)
+    actions = rng.integers(-1, 4, size=(steps, num_games), dtype=np.int8)
+
+    mismatches = 0
+    finished = 0
+    for t in range(steps):
+        _, dones = batch.step(actions[t])
+        for game, engine in enumerate(engines):
+            if actions[t, game] != NO_ACTION:
+                engine.handle_direction(DIRECTIONS[actions[t, game]])
+            engine.update()
+            problem = mismatch(engine, batch, game, dones[game])
+            if problem is not None:
+                mismatches += 1
+                print(f"tick {t} game {game}: {problem}")
+                # Start both over so one divergence is reported once
+                engine.game_over = dones[game] = True
+            if dones[game]:
+                finished += 1
+                engine.reset_game()
+            else:
+                engine.food.position = batch.food_position(game)
+        batch.reset(dones)
+        for game in np.flatnonzero(dones):
+            engines[game].food.position = batch.food_position(game)
+    print(f"Verified {num_games} games for {steps} ticks ({finished} rounds finished): {mismatches} mismatches")
+    return mismatches
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != '--verify']
+    if '--verify' in sys.argv:
+        steps = int(args[0]) if args else 1000
+        num_games = int(args[1]) if len(args) > 1 else 300
+        sys.exit(1 if verify(num_games, steps) else 0)
+
+    steps = int(args[0]) if args else 200
+    print(f"Board {GRID_WIDTH}x{GRID_HEIGHT}, {steps} ticks per batch size")
+    print(f"{'games':>8} {'game steps/sec':>16}")
+    for num_games in (1, 16, 256, 1024, 4096):
+        print(f"{num_games:>8} {bench(num_games, steps):>16,.0f}")
+
+
+if __name__ == '__main__':
+    main()
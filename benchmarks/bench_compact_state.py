@@ -0,0 +1,97 @@
+"""
+Memory and tick-time benchmark: GameEngine with Snake (deque + set of tuples) vs
+the same engine with CompactSnake (array('H') ring buffers + packed bit grid) at
+several board sizes.
+
+The snake is laid along a Hamiltonian cycle covering half the board and then
+follows the cycle, so it never dies; the food is parked off the board so its
+length stays fixed. Memory is what tracemalloc attributes to the whole engine
+(snake, free-cell index, food and RNG) after it is built.
+
+Usage: python benchmarks/bench_compact_state.py [ticks]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.compact_state import CompactSnake
+from game.game_engine import GameEngine
+from game.snake import Direction
+
+BOARDS = [(40, 30), (200, 200), (1000, 1000)]
+
+
+class CompactEngine(GameEngine):
+    snake_class = CompactSnake
+
+
+def cycle_arrays(width, height):
+    """Hamiltonian cycle of an even-height board (as in bench_render) as x and y arrays."""
+    xs, ys = array('H'), array('H')
+    for x in range(width):
+        xs.append(x)
+        ys.append(0)
+    for y in range(1, height):
+        for x in (range(width - 1, 0, -1) if y % 2 == 1 else range(1, width)):
+            xs.append(x)
+            ys.append(y)
+    for y in range(height - 1, 0, -1):
+        xs.append(0)
+        ys.append(y)
+    return xs, ys
+
+
+def build(compact, width, height, xs, ys, length):
+    """Engine with a width x height play area, the snake's head at cycle[length - 1]
+    and its tail at cycle[0]."""
+    engine = (CompactEngine if compact else GameEngine)(width + 1, height + 4)
+    engine.free_cells.add(engine.snake.head)
+    engine.snake.set_body((xs[i], ys[i]) for i in range(length - 1, -1, -1))
+    for cell in engine.snake.body:
+        engine.free_cells.remove(cell)
+    engine.food.position = None
+    return engine
+
+
+def measure_memory(compact, width, height, xs, ys, length):
+    tracemalloc.start()
+    engine = build(compact, width, height, xs, ys, length)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return engine, used
+
+
+def measure_ticks(engine, xs, ys, length, ticks):
+    n = len(xs)
+    directions = {direction.value: direction for direction in Direction}
+    snake = engine.snake
+    start = time.perf_counter()
+    for i in range(length - 1, length - 1 + ticks):
+        a, b = i % n, (i + 1) % n
+        snake.next_direction = directions[(xs[b] - xs[a], ys[b] - ys[a])]
+        engine.update()
+    if engine.game_over:
+        raise AssertionError('unexpected collision')
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'board':>11} {'length':>8} {'snake':>13} {'memory':>10} {'B/cell':>8} {'tick (us)':>10}")
+    for width, height in BOARDS:
+        xs, ys = cycle_arrays(width, height)
+        length = len(xs) // 2
+        for compact in (False, True):
+            engine, used = measure_memory(compact, width, height, xs, ys, length)
+            tick = measure_ticks(engine, xs, ys, length, ticks)
+            print(f"{width:>5}x{height:<5} {length:>8} {engine.snake_class.__name__:>13} "
+                  f"{used / 2 ** 20:>8.2f}MB {used / (width * height):>8.1f} {tick * 1e6:>10.3f}")
+            del engine
+
+
+if __name__ == '__main__':
+    main()
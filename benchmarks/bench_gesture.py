@@ -0,0 +1,110 @@
+"""
+Gesture pipeline benchmark on recorded or synthetic data.
+
+Replays a recording through GestureDetector.detect() headless and reports
+frames/sec, per-stage latency percentiles and classification accuracy against the
+recording's labeled Direction ground truth: raw per-frame classification vs the
+temporally filtered output, which may stay silent but should rarely be wrong.
+Direction flips per second of recording time show how jittery each output is
+next to how often the labeled direction actually changes.
+Without --mediapipe the recorded landmarks replace model inference, so this runs
+on a CPU-only CI box with just OpenCV and NumPy.
+
+Usage:
+    python benchmarks/bench_gesture.py                  # synthetic recording
+    python benchmarks/bench_gesture.py PREFIX           # recorded session
+    python benchmarks/bench_gesture.py PREFIX --mediapipe --roi-tracking
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ml.gesture_recording import open_replay, synthesize_recording
+
+STAGES = ('flip', 'preprocess', 'inference', 'postprocess')
+
+
+def run(prefix, use_mediapipe, detector_options):
+    capture, detector = open_replay(prefix, use_mediapipe=use_mediapipe, **detector_options)
+    detector.gesture_cooldown = 0.0
+    recording = capture.recording
+
+    stage_samples = {stage: [] for stage in STAGES}
+    labeled = raw_correct = filtered_correct = filtered_wrong = 0
+    # Last direction and number of changes of the label, raw and filtered streams
+    last = {'label': None, 'raw': None, 'filtered': None}
+    flips = dict.fromkeys(last, 0)
+
+    start = time.perf_counter()
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        gesture, _ = detector.detect(frame)
+        for stage in STAGES:
+            stage_samples[stage].append(detector.stage_times[stage][-1])
+
+        label = recording.label(capture.position - 1)
+        if label is None or not detector.last_results.multi_hand_landmarks:
+            continue
+        labeled += 1
+        raw = detector._classify_gesture(detector.landmarks)
+        raw_correct += raw == label
+        filtered_correct += gesture == label
+        filtered_wrong += gesture is not None and gesture != label
+        for stream, direction in (('label', label), ('raw', raw), ('filtered', gesture)):
+            if direction is not None and direction != last[stream]:
+                flips[stream] += last[stream] is not None
+                last[stream] = direction
+    elapsed = time.perf_counter() - start
+    frames = len(recording)
+    timestamps = recording.records['timestamp'][:frames]
+    duration = float(timestamps[-1] - timestamps[0]) if frames > 1 else 0.0
+
+    print(f"Frames: {frames} ({recording.width}x{recording.height}), "
+          f"{frames / elapsed:,.0f} frames/sec, inference: {'mediapipe' if use_mediapipe else 'recorded landmarks'}")
+    print(f"{'stage':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for stage in STAGES:
+        p50, p95, p99 = np.percentile(np.array(stage_samples[stage]) * 1000, [50, 95, 99])
+        print(f"{stage:<12} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f}")
+    if labeled:
+        # A wrong direction can steer the snake into a wall; a silent frame cannot
+        print(f"On {labeled} labeled frames with a hand:")
+        print(f"  raw       correct {raw_correct / labeled:6.1%}  wrong {1 - raw_correct / labeled:6.1%}")
+        print(f"  filtered  correct {filtered_correct / labeled:6.1%}  wrong {filtered_wrong / labeled:6.1%}")
+    if duration > 0:
+        print(f"Direction flips/sec over {duration:.1f} s: label {flips['label'] / duration:.2f}, "
+              f"raw {flips['raw'] / duration:.2f}, filtered {flips['filtered'] / duration:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('prefix', nargs='?', help="recording prefix (default: synthesize one)")
+    parser.add_argument('--mediapipe', action='store_true', help="run the real hand model on recorded frames")
+    parser.add_argument('--inference-size', metavar='WxH')
+    parser.add_argument('--roi-tracking', action='store_true')
+    parser.add_argument('--frames', type=int, default=1200, help="synthetic recording length")
+    args = parser.parse_args()
+
+    detector_options = {'roi_tracking': args.roi_tracking}
+    if args.inference_size:
+        width, height = args.inference_size.lower().split('x')
+        detector_options['inference_size'] = (int(width), int(height))
+
+    if args.prefix:
+        run(args.prefix, args.mediapipe, detector_options)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, 'synthetic')
+        synthesize_recording(prefix, frame_count=args.frames)
+        run(prefix, args.mediapipe, detector_options)
+
+
+if __name__ == '__main__':
+    main()
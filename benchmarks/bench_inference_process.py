@@ -0,0 +1,130 @@
+"""
+Main-loop frame rate with gesture inference in-process vs in a worker process.
+
+A synthetic camera (a looping recording paced at 30 fps) feeds either
+CapturePipeline, whose inference thread shares this interpreter with the game
+loop, or ProcessCapturePipeline, which runs detection in its own process. The
+hand model is replaced by SyntheticHands, which holds the interpreter for a fixed
+time per frame the way MediaPipe's Python-side work does, so this runs without
+MediaPipe or a webcam. The game loop renders as fast as it can on SDL's dummy
+driver and reports frames/sec and frame-time percentiles.
+
+On a single core the worker process has nowhere to run in parallel, so expect a
+gain only on multi-core machines.
+
+Usage: python benchmarks/bench_inference_process.py [seconds] [model_ms]
+"""
+import functools
+import os
+import sys
+import tempfile
+import time
+import types
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pygame
+
+from game.game_engine import GameEngine
+from game.profiler import percentile
+from game.renderer import Renderer
+from ml.capture_pipeline import CapturePipeline, PipelineMetrics
+from ml.gesture_detector import GestureDetector
+from ml.gesture_recording import Recording, ReplayCapture, synthesize_recording
+from ml.process_inference import ProcessCapturePipeline
+
+
+class SyntheticHands:
+    """MediaPipe Hands stand-in: spends model_ms of interpreter time, then reports a thumb up."""
+
+    def __init__(self, model_ms):
+        self.model_ms = model_ms
+        landmark = [types.SimpleNamespace(x=0.5, y=0.6, z=0.0) for _ in range(21)]
+        landmark[4] = types.SimpleNamespace(x=0.5, y=0.45, z=0.0)
+        self._results = types.SimpleNamespace(multi_hand_landmarks=[types.SimpleNamespace(landmark=landmark)])
+
+    def process(self, rgb_frame):
+        end = time.perf_counter() + self.model_ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+        return self._results
+
+
+class NoInference:
+    """Pipeline stand-in with no camera or model, for the baseline frame rate."""
+
+    def __init__(self):
+        self.metrics = PipelineMetrics()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def poll_direction(self):
+        return None
+
+    def poll_frame(self):
+        return None
+
+
+def game_loop(pipeline, seconds):
+    engine = GameEngine(40, 30, seed=0)
+    renderer = Renderer(800, 600, 20)
+    frame_times = []
+    directions = 0
+    end = time.perf_counter() + seconds
+    last = time.perf_counter()
+    while last < end:
+        pygame.event.pump()
+        if pipeline.poll_direction() is not None:
+            directions += 1
+        pipeline.poll_frame()
+        engine.update()
+        if engine.game_over:
+            engine.reset_game()
+        renderer.render(engine)
+        now = time.perf_counter()
+        frame_times.append(now - last)
+        last = now
+    return frame_times, directions
+
+
+def run(label, pipeline, seconds):
+    pipeline.start()
+    try:
+        frame_times, directions = game_loop(pipeline, seconds)
+    finally:
+        pipeline.stop()
+    frame_times.sort()
+    metrics = pipeline.metrics
+    print(f"{label:<16} {len(frame_times) / seconds:>8.0f} {percentile(frame_times, 50) * 1e3:>8.2f} "
+          f"{percentile(frame_times, 99) * 1e3:>8.2f} {metrics.frames_processed / seconds:>10.1f} "
+          f"{directions:>10}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    model_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    pygame.init()
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = os.path.join(tmp, 'camera')
+        synthesize_recording(prefix, frame_count=90, width=640, height=480)
+        recording = Recording(prefix)
+
+        print(f"{os.cpu_count()} CPUs, synthetic model {model_ms:.0f} ms/frame, camera 640x480 @ 30 fps")
+        print(f"{'inference':<16} {'fps':>8} {'p50 ms':>8} {'p99 ms':>8} {'detect/s':>10} {'directions':>10}")
+        pipeline = CapturePipeline(ReplayCapture(recording, loop=True, fps=30),
+                                   GestureDetector(hands=SyntheticHands(model_ms)))
+        run('none', NoInference(), seconds)
+        run('thread', pipeline, seconds)
+        run('process', ProcessCapturePipeline(ReplayCapture(recording, loop=True, fps=30),
+                                              hands_factory=functools.partial(SyntheticHands, model_ms)),
+            seconds)
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
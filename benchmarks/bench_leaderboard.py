@@ -0,0 +1,85 @@
+"""
+Leaderboard benchmark: a log with many games, loaded, queried and appended to.
+
+Reports how long the writer thread takes to load the log, what submit(), top()
+and best() cost on the game thread while the writer is busy, write throughput,
+and the effect of compaction on the file size.
+
+Usage: python benchmarks/bench_leaderboard.py [games] [players]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.leaderboard import FILE_HEADER, FILE_MAGIC, FORMAT_VERSION, RECORD, Leaderboard
+
+
+def write_log(path, games, players, rng):
+    """Write a log directly, as years of kiosk play would have."""
+    now = time.time()
+    with open(path, 'wb') as f:
+        f.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION))
+        f.write(b''.join(RECORD.pack(now - games + i, rng.randrange(0, 2000) * 10,
+                                     f"player{rng.randrange(players)}".encode())
+                         for i in range(games)))
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'leaderboard.bin')
+        write_log(path, games, players, rng)
+        size = os.path.getsize(path)
+
+        # Compaction off for now, so the full log is what gets loaded
+        leaderboard = Leaderboard(path, compact_ratio=float('inf'))
+        start = time.perf_counter()
+        leaderboard.start()
+        reads = 0
+        while not leaderboard.ready:
+            leaderboard.top(10)
+            leaderboard.best('player1')
+            reads += 1
+        elapsed = time.perf_counter() - start
+        print(f"Loaded {games:,} games ({size / 1024:,.0f} KiB) in {elapsed * 1000:.0f} ms; "
+              f"{reads:,} lookups answered meanwhile without waiting")
+
+        calls = 100000
+        submit_us = per_call_us(lambda i: leaderboard.submit(f"player{i % players}", i % 20000), calls)
+        top_us = per_call_us(lambda i: leaderboard.top(10), calls)
+        best_us = per_call_us(lambda i: leaderboard.best(f"player{i % players}"), calls)
+        print(f"Game thread, writer busy: submit {submit_us:.2f} us, top(10) {top_us:.2f} us, "
+              f"best {best_us:.2f} us")
+
+        start = time.perf_counter()
+        leaderboard.flush()
+        elapsed = time.perf_counter() - start
+        print(f"Writer had all {calls:,} games on disk {elapsed * 1000:.0f} ms after the last submit")
+        leaderboard.close()
+
+        leaderboard = Leaderboard(path)
+        start = time.perf_counter()
+        leaderboard.start()
+        leaderboard.flush()
+        elapsed = time.perf_counter() - start
+        print(f"Reloaded and compacted in {elapsed * 1000:.0f} ms: {os.path.getsize(path) / 1024:,.0f} KiB, "
+              f"{leaderboard.records:,} live records ({len(leaderboard.top(1000))} top, {players} player bests)")
+        leaderboard.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Render-cost benchmark: full redraw vs dirty-rectangle incremental redraw.
+
+The snake follows a Hamiltonian cycle of the playable area so it can be any length
+without dying, advancing one tick per frame. Runs on SDL's dummy video driver, so
+the numbers reflect drawing cost rather than the display compositor.
+
+Usage: python benchmarks/bench_render.py [frames]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pygame
+
+from game.autopilot import hamiltonian_cycle
+from game.game_engine import GameEngine
+from game.renderer import Renderer
+from game.snake import Direction
+
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+GRID_SIZE = 20
+
+
+def place_snake(engine, cycle, length):
+    """Lay the snake along the cycle with its head at cycle[length - 1]."""
+    snake = engine.snake
+    snake.set_body(reversed(cycle[:length]))
+    snake.prev_head = cycle[length - 2] if length > 1 else None
+    engine.food.position = None
+
+
+def bench(renderer, engine, cycle, length, frames):
+    place_snake(engine, cycle, length)
+    snake = engine.snake
+    n = len(cycle)
+    renderer.render(engine)
+
+    start = time.perf_counter()
+    for i in range(frames):
+        head, nxt = cycle[(length - 1 + i) % n], cycle[(length + i) % n]
+        snake.next_direction = Direction((nxt[0] - head[0], nxt[1] - head[1]))
+        snake.move(grow=False)
+        renderer.render(engine)
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.init()
+    engine = GameEngine(WINDOW_WIDTH // GRID_SIZE, WINDOW_HEIGHT // GRID_SIZE)
+    width = engine.play_width
+    cycle = [(c % width, c // width) for c in hamiltonian_cycle(width, engine.play_height)]
+    full = Renderer(WINDOW_WIDTH, WINDOW_HEIGHT, GRID_SIZE, incremental=False)
+    incremental = Renderer(WINDOW_WIDTH, WINDOW_HEIGHT, GRID_SIZE, incremental=True)
+
+    print(f"{frames} frames per sample, one tick per frame")
+    print(f"{'length':>8} {'full (ms)':>11} {'incremental (ms)':>18}")
+    for length in (1, 10, 100, 400, len(cycle) - 1):
+        full_ms = 1000 * bench(full, engine, cycle, length, frames)
+        incremental_ms = 1000 * bench(incremental, engine, cycle, length, frames)
+        print(f"{length:>8} {full_ms:>11.3f} {incremental_ms:>18.3f}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Replay benchmark: record a long synthetic session, then re-simulate it headless.
+
+Reports recording throughput, file size, full verification speed (every stretch
+between snapshots re-simulated and compared byte for byte with the next snapshot)
+and the cost of seeking to random ticks.
+
+Usage: python benchmarks/bench_replay.py [ticks] [snapshot_interval]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.game_replay import GameRecording, Replayer, random_session
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.rec')
+        start = time.perf_counter()
+        random_session(path, ticks=ticks, snapshot_interval=interval)
+        elapsed = time.perf_counter() - start
+        print(f"Recorded {ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/sec), "
+              f"{os.path.getsize(path) / 1024:,.0f} KiB")
+
+        recording = GameRecording(path)
+        print(f"{len(recording.turn_ticks)} turns, {len(recording.snapshots)} snapshots "
+              f"({sum(recording.snapshot_is_reset)} round starts)")
+
+        replayer = Replayer(recording)
+        start = time.perf_counter()
+        simulated = replayer.verify()
+        elapsed = time.perf_counter() - start
+        print(f"Verified {simulated} ticks in {elapsed:.2f}s ({simulated / elapsed:,.0f} ticks/sec)")
+
+        rng = random.Random(0)
+        targets = [rng.randrange(1, recording.last_tick + 1) for _ in range(200)]
+        start = time.perf_counter()
+        for tick in targets:
+            replayer.seek(tick)
+        elapsed = time.perf_counter() - start
+        print(f"Seek: {elapsed / len(targets) * 1000:.2f} ms average over {len(targets)} random ticks")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: per-tick cost of snake movement and self-collision vs snake length.
+
+Builds a snake of a given length along a serpentine path that fills the board, then
+times move + tail removal + collision check. The list-based baseline reproduces the
+old list.insert(0) / body[0] in body[1:] approach for comparison.
+
+Usage: python benchmarks/bench_snake_tick.py [width] [height]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.snake import Snake, Direction
+
+
+def serpentine(width, height):
+    """Cells of a boustrophedon path covering the board, starting at (0, 0)."""
+    for y in range(height):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        for x in xs:
+            yield (x, y)
+
+
+def build_path(width, height):
+    return list(serpentine(width, height))
+
+
+def bench_deque(path, length, ticks):
+    snake = Snake(1, 1)
+    # Head first: the snake's head is at path[length - 1], tail at path[0]
+    snake.set_body(reversed(path[:length]))
+
+    turns = [Direction((b[0] - a[0], b[1] - a[1])) for a, b in zip(path[length - 1:], path[length:length + ticks])]
+
+    start = time.perf_counter()
+    for direction in turns:
+        snake.next_direction = direction
+        if snake.move():
+            raise AssertionError('unexpected collision')
+        snake.remove_tail()
+    return (time.perf_counter() - start) / ticks
+
+
+def bench_list(path, length, ticks):
+    body = list(reversed(path[:length]))
+
+    start = time.perf_counter()
+    for i in range(ticks):
+        new_head = path[length + i]
+        body.insert(0, new_head)
+        body.pop()
+        if body[0] in body[1:]:
+            raise AssertionError('unexpected collision')
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    path = build_path(width, height)
+    cells = len(path)
+    ticks = 200
+
+    lengths = sorted({1, 10, 100, cells // 4, cells // 2, cells - ticks - 1})
+    lengths = [n for n in lengths if 0 < n <= cells - ticks - 1]
+
+    print(f"Board {width}x{height} ({cells} cells), {ticks} ticks per sample")
+    print(f"{'length':>8} {'deque+set (us)':>16} {'list (us)':>12}")
+    for length in lengths:
+        fast = bench_deque(path, length, ticks)
+        slow = bench_list(path, length, ticks)
+        print(f"{length:>8} {fast * 1e6:>16.3f} {slow * 1e6:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Load test for the socket input source.
+
+Opens several TCP clients that each send a stream of directions and wait for the
+"ok" acknowledgement, reporting throughput and round-trip percentiles. Without
+--port an in-process SocketSource and queue consumer are started, together with
+a 60 Hz task that measures how late it wakes up (the lag a render task would
+see) while the clients hammer the event loop. With --port it targets a running
+game started with `python app.py --input-socket PORT`.
+
+Usage: python benchmarks/bench_socket_input.py [--port PORT] [--clients N] [--messages M]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from game.input_sources import SocketSource
+from game.profiler import percentile
+
+DIRECTION_NAMES = [b'UP\n', b'DOWN\n', b'LEFT\n', b'RIGHT\n']
+
+
+async def client(port, messages, round_trips, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for _ in range(messages):
+        start = time.perf_counter()
+        writer.write(rng.choice(DIRECTION_NAMES))
+        await writer.drain()
+        reply = await reader.readline()
+        if reply != b'ok\n':
+            raise RuntimeError(f"unexpected reply {reply!r}")
+        round_trips.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def consume(queue):
+    while True:
+        await queue.get()
+
+
+async def frame_lag(lags, interval=1 / 60):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(port, clients, messages):
+    tasks = []
+    source = None
+    lags = []
+    if port is None:
+        source = SocketSource(port=0)
+        queue = asyncio.Queue(maxsize=256)
+        tasks = [asyncio.ensure_future(source.run(queue)), asyncio.ensure_future(consume(queue)),
+                 asyncio.ensure_future(frame_lag(lags))]
+        while source.port == 0:
+            await asyncio.sleep(0.01)
+        port = source.port
+
+    round_trips = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, messages, round_trips, seed) for seed in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    if source is not None:
+        source.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    ordered = sorted(round_trips)
+    print(f"{clients} clients x {messages} directions: {len(ordered) / elapsed:,.0f} directions/sec")
+    print(f"round trip ms  p50 {percentile(ordered, 50) * 1e3:.3f}  p99 {percentile(ordered, 99) * 1e3:.3f}  "
+          f"max {ordered[-1] * 1e3:.3f}")
+    if lags:
+        lags.sort()
+        print(f"60 Hz task wake-up lag ms  p50 {percentile(lags, 50) * 1e3:.3f}  "
+              f"p99 {percentile(lags, 99) * 1e3:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, help="port of a running game (default: in-process server)")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--messages', type=int, default=2000, help="directions sent per client")
+    args = parser.parse_args()
+    asyncio.run(run(args.port, args.clients, args.messages))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Arena mode: K snakes on one board.
+
+All snakes share one occupancy grid that stores, for every cell, the id of the
+snake on it (0 when empty). Resolving a tick is therefore O(K): each snake's next
+head is checked against the grid for head-to-body hits and against a dict of the
+other next heads for head-to-head hits, without scanning any body.
+
+Snakes move simultaneously. Per tick:
+  1. every living snake takes its queued turn and computes its next head;
+  2. snakes leaving the board die;
+  3. snakes that are not about to eat free their tail cell, so a head may
+     follow any tail, its own or another snake's;
+  4. snakes whose next heads coincide die together, as do two snakes swapping
+     head cells and snakes whose next head lands on a body;
+  5. survivors move, eaten food respawns and dead snakes are removed from the
+     grid (with respawn=True they are put back at once as length-1 snakes).
+"""
+import random
+from array import array
+
+from game.free_cells import FreeCellIndex
+from game.snake import Snake, Direction, OPPOSITE
+
+DIRECTIONS = list(Direction)
+EMPTY = 0
+
+
+class ArenaEngine:
+    def __init__(self, grid_width, grid_height, num_snakes, seed=None, num_food=None, respawn=False):
+        """
+        num_food: food items on the board at once (default: one per snake).
+        respawn: put dead snakes straight back as length-1 snakes on random free cells.
+        """
+        if num_snakes >= 0xFFFF:
+            raise ValueError("too many snakes for a 16-bit occupancy grid")
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        # Same playable area as GameEngine, so a board can be drawn the same way
+        self.play_width = grid_width - 1
+        self.play_height = grid_height - 4
+        self.num_snakes = num_snakes
+        self.num_food = num_snakes if num_food is None else num_food
+        self.respawn = respawn
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.reset_game()
+
+    def reset_game(self):
+        self.grid = array('H', bytes(2 * self.play_width * self.play_height))
+        # Cells that hold neither a snake nor food; food spawns here in O(1)
+        self.free_cells = FreeCellIndex(self.play_width, self.play_height)
+        self.food = set()
+        self.snakes = [None] * self.num_snakes
+        self.alive = [False] * self.num_snakes
+        self.scores = [0] * self.num_snakes
+        self.deaths = [0] * self.num_snakes
+        for i in range(self.num_snakes):
+            self._spawn_snake(i)
+        for _ in range(self.num_food):
+            self._spawn_food()
+        self.game_over = False
+
+    def _index(self, cell):
+        return cell[1] * self.play_width + cell[0]
+
+    def _spawn_snake(self, i):
+        """Place snake i as a single segment on a random free cell. Returns False if none."""
+        cell = self.free_cells.choice(self.rng)
+        if cell is None:
+            return False
+        snake = Snake(self.play_width, self.play_height)
+        snake.set_body([cell])
+        snake.direction = snake.next_direction = self.rng.choice(DIRECTIONS)
+        self.snakes[i] = snake
+        self.alive[i] = True
+        self.grid[self._index(cell)] = i + 1
+        self.free_cells.remove(cell)
+        return True
+
+    def _spawn_food(self):
+        cell = self.free_cells.choice(self.rng)
+        if cell is not None:
+            self.food.add(cell)
+            self.free_cells.remove(cell)
+
+    def queue_direction(self, i, direction):
+        """Buffer a turn for snake i, with the same rules as Snake.queue_direction."""
+        if self.alive[i]:
+            return self.snakes[i].queue_direction(direction)
+        return False
+
+    def occupant(self, cell):
+        """Id of the snake on cell (0-based), or None if it is empty or off the board."""
+        x, y = cell
+        if not (0 <= x < self.play_width and 0 <= y < self.play_height):
+            return None
+        owner = self.grid[y * self.play_width + x]
+        return owner - 1 if owner else None
+
+    def is_free(self, cell):
+        """True if cell is on the board and no snake is on it (food counts as free)."""
+        x, y = cell
+        return (0 <= x < self.play_width and 0 <= y < self.play_height
+                and self.grid[y * self.play_width + x] == EMPTY)
+
+    def update(self):
+        if self.game_over:
+            return
+        self.tick += 1
+        grid, width, height = self.grid, self.play_width, self.play_height
+        snakes, alive, food = self.snakes, self.alive, self.food
+
+        # 1-2: next heads; leaving the board is fatal
+        moving = []
+        dying = []
+        for i in range(self.num_snakes):
+            if not alive[i]:
+                continue
+            snake = snakes[i]
+            snake.apply_queued_direction()
+            dx, dy = snake.next_direction.value
+            head_x, head_y = snake.body[0]
+            x, y = head_x + dx, head_y + dy
+            if 0 <= x < width and 0 <= y < height:
+                moving.append((i, (x, y)))
+            else:
+                dying.append(i)
+
+        # 3: free the tails of snakes that won't grow this tick
+        for i, next_head in moving:
+            if next_head not in food:
+                snake = snakes[i]
+                tail = snake.body[-1]
+                grid[tail[1] * width + tail[0]] = EMPTY
+                self.free_cells.add(tail)
+
+        # 4: head-to-head through dicts of next and current heads, head-to-body
+        # through the grid
+        heads = {}
+        current = {}
+        for i, next_head in moving:
+            heads.setdefault(next_head, []).append(i)
+            current[snakes[i].body[0]] = i
+        survivors = []
+        for i, next_head in moving:
+            other = current.get(next_head)
+            swapped = other is not None and other != i and heads.get(snakes[i].body[0]) == [other]
+            if swapped or len(heads[next_head]) > 1 or grid[next_head[1] * width + next_head[0]] != EMPTY:
+                dying.append(i)
+            else:
+                survivors.append((i, next_head))
+
+        # 5: move survivors, then clear the dead
+        eaten = 0
+        for i, next_head in survivors:
+            snake = snakes[i]
+            grow = next_head in food
+            snake.move(grow=grow)
+            grid[next_head[1] * width + next_head[0]] = i + 1
+            self.free_cells.remove(next_head)
+            if grow:
+                food.discard(next_head)
+                self.scores[i] += 10
+                eaten += 1
+        for i in dying:
+            self._remove_snake(i)
+        for _ in range(eaten):
+            self._spawn_food()
+
+        if self.respawn:
+            for i in dying:
+                self._spawn_snake(i)
+        elif not any(alive):
+            self.game_over = True
+
+    def _remove_snake(self, i):
+        """Clear snake i's cells from the grid. Tail cells already freed are skipped."""
+        grid, width = self.grid, self.play_width
+        owner = i + 1
+        for cell in self.snakes[i].body:
+            index = cell[1] * width + cell[0]
+            if grid[index] == owner:
+                grid[index] = EMPTY
+                self.free_cells.add(cell)
+        self.alive[i] = False
+        self.deaths[i] += 1
+
+    def living(self):
+        return sum(self.alive)
+
+
+class ArenaBot:
+    """
+    Greedy BotSource policy for arena snake `index`: head for one food cell and
+    step onto the free neighbour closest to it. The target is only chosen again,
+    as the food nearest the head, once it has been eaten, so most ticks cost O(1)
+    whatever the amount of food. It decides once per tick and returns None
+    otherwise, or when the snake is dead or boxed in.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.target = None  # Food cell the bot is heading for
+        self._decided = None  # (snake, tick) of the last decision
+
+    def __call__(self, arena):
+        if not arena.alive[self.index]:
+            return None
+        snake = arena.snakes[self.index]
+        if self._decided == (snake, arena.tick):
+            return None
+        self._decided = (snake, arena.tick)
+        head_x, head_y = snake.body[0]
+        if self.target not in arena.food:
+            self.target = min(arena.food, key=lambda f: abs(f[0] - head_x) + abs(f[1] - head_y), default=None)
+        target_x, target_y = self.target if self.target is not None else (head_x, head_y)
+        best = None
+        best_distance = None
+        for direction in DIRECTIONS:
+            if direction == OPPOSITE[snake.direction]:
+                continue
+            dx, dy = direction.value
+            x, y = head_x + dx, head_y + dy
+            if not arena.is_free((x, y)):
+                continue
+            distance = abs(target_x - x) + abs(target_y - y)
+            if best is None or distance < best_distance:
+                best, best_distance = direction, distance
+        return best
@@ -0,0 +1,278 @@
+"""
+Pathfinding autopilot for attract-mode demos, load tests and engine benchmarks.
+
+Each tick the autopilot picks the next cell for the head, in order of preference:
+
+1. the shortest path to the food, if after eating the snake could still reach
+   its own tail (otherwise it may have walled itself in);
+2. the next cell on a Hamiltonian cycle of the board, if it is free and the
+   tail is still reachable after stepping there. Following the cycle always
+   reaches the food eventually, so the snake cannot circle forever;
+3. the shortest path to its tail, which buys time until a safe path to the
+   food opens up;
+4. any free neighbour.
+
+Searches are breadth-first over flat cell indices and read occupancy straight
+from the engine's FreeCellIndex, so nothing scans the body. A path stays valid
+while the head follows it: its cells were free when it was found and only the
+snake's own head can enter them. So a plan is reused tick after tick and the
+board is searched again only when the food moves, the snake grows or the head
+goes somewhere unplanned.
+"""
+import itertools
+import time
+from array import array
+from collections import deque
+
+from game.snake import Direction, OPPOSITE
+
+
+def hamiltonian_cycle(width, height):
+    """
+    Flat cell indices of a cycle through every cell of the board, or None when
+    both sides are odd. Serpentine over rows (or columns) and back along one edge.
+    """
+    if height % 2 == 0 and width > 1:
+        cycle = [(x, 0) for x in range(width)]
+        for y in range(1, height):
+            xs = range(width - 1, 0, -1) if y % 2 == 1 else range(1, width)
+            cycle.extend((x, y) for x in xs)
+        cycle.extend((0, y) for y in range(height - 1, 0, -1))
+    elif width % 2 == 0 and height > 1:
+        cycle = [(0, y) for y in range(height)]
+        for x in range(1, width):
+            ys = range(height - 1, 0, -1) if x % 2 == 1 else range(1, height)
+            cycle.extend((x, y) for y in ys)
+        cycle.extend((x, 0) for x in range(width - 1, 0, -1))
+    else:
+        return None
+    return [y * width + x for x, y in cycle]
+
+
+class Autopilot:
+    """
+    BotSource policy: call autopilot(engine) for the Direction to queue this tick.
+    It decides once per tick and returns None otherwise, or when it has no move.
+    """
+
+    def __init__(self, reuse=True):
+        """reuse: follow the previous plan while it is valid (False searches every tick)."""
+        self.reuse = reuse
+        self.decisions = 0
+        self.searches = 0
+        self.decision_time = 0.0
+        self._board = None
+        self._decided = None  # (snake, tick) of the last decision
+        self._plan = deque()  # Flat cells still to step into
+        self._plan_food = -1  # Food cell a food plan leads to, -1 for a tail plan
+        self._plan_length = 0
+        self._expected_head = -1
+
+    @property
+    def decisions_per_second(self):
+        return self.decisions / self.decision_time if self.decision_time else 0.0
+
+    def __call__(self, engine):
+        snake = engine.snake
+        if engine.game_over or self._decided == (snake, engine.tick):
+            return None
+        self._decided = (snake, engine.tick)
+        start = time.perf_counter()
+        self._set_board(engine.play_width, engine.play_height)
+        head = self._flat(snake.head)
+        cell = self._next_cell(engine, head)
+        direction = None
+        if cell is not None:
+            self._expected_head = cell
+            direction = self._directions[cell - head]
+        self.decisions += 1
+        self.decision_time += time.perf_counter() - start
+        return direction
+
+    def _set_board(self, width, height):
+        if self._board == (width, height):
+            return
+        self._board = (width, height)
+        self.width = width
+        size = width * height
+        self._seen = array('I', bytes(4 * size))
+        self._walls = array('I', bytes(4 * size))
+        self._vacated = array('I', bytes(4 * size))
+        self._parent = array('i', bytes(4 * size))
+        self._stamp = 0
+        self._directions = {-width: Direction.UP, width: Direction.DOWN,
+                            -1: Direction.LEFT, 1: Direction.RIGHT}
+        self._cycle_next = None
+        cycle = hamiltonian_cycle(width, height)
+        if cycle is not None:
+            self._cycle_next = array('I', bytes(4 * size))
+            for i, cell in enumerate(cycle):
+                self._cycle_next[cell] = cycle[(i + 1) % size]
+        self._plan.clear()
+
+    def _flat(self, cell):
+        return cell[1] * self.width + cell[0]
+
+    def _next_cell(self, engine, head):
+        snake = engine.snake
+        free_cells = engine.free_cells
+        positions, count = free_cells.positions, free_cells.count
+        length = len(snake.body)
+        # Moving into the tail is fine, it moves on first; with two cells it is the neck
+        tail = self._flat(snake.body[-1]) if length > 2 else -1
+        food = engine.food.position
+        food = self._flat(food) if food is not None else -1
+
+        plan = self._plan
+        if (self.reuse and plan and head == self._expected_head and length == self._plan_length
+                and (self._plan_food < 0 or self._plan_food == food)):
+            cell = plan.popleft()
+            if positions[cell] < count or cell == tail:
+                return cell
+        plan.clear()
+        # The snake cannot reverse onto itself, even when it is a single cell
+        dx, dy = OPPOSITE[snake.direction].value
+        x, y = snake.head[0] + dx, snake.head[1] + dy
+        behind = y * self.width + x if 0 <= x < engine.play_width and 0 <= y < engine.play_height else -1
+
+        if food >= 0:
+            path = self._search(head, food, tail, behind, positions, count)
+            if path is not None and self._tail_reachable_after(snake.body, path, positions, count):
+                return self._follow(path, food, length)
+        cycle_next = self._cycle_next
+        if cycle_next is not None:
+            cell = cycle_next[head]
+            if (cell != behind and (positions[cell] < count or cell == tail)
+                    and self._tail_reachable_after(snake.body, [cell], positions, count, grow=False)):
+                return cell
+        if tail >= 0:
+            path = self._search(head, tail, tail, behind, positions, count)
+            if path is not None:
+                return self._follow(path, -1, length)
+        for cell in self._neighbours(head):
+            if cell != behind and (positions[cell] < count or cell == tail):
+                return cell
+        return None
+
+    def _follow(self, path, food, length):
+        self._plan.extend(path)
+        self._plan_food = food
+        self._plan_length = length
+        return self._plan.popleft()
+
+    def _neighbours(self, cell):
+        width = self.width
+        x = cell % width
+        size = len(self._seen)
+        if cell >= width:
+            yield cell - width
+        if cell + width < size:
+            yield cell + width
+        if x > 0:
+            yield cell - 1
+        if x < width - 1:
+            yield cell + 1
+
+    def _search(self, head, goal, tail, behind, positions, count):
+        """Shortest path of cells from head (exclusive) to goal over free cells, or None."""
+        self.searches += 1
+        self._stamp += 1
+        stamp, seen, parent = self._stamp, self._seen, self._parent
+        width = self.width
+        size = len(seen)
+        seen[head] = stamp
+        if behind >= 0:
+            seen[behind] = stamp
+        frontier = [head]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                x = cell % width
+                for neighbour in (cell - width, cell + width,
+                                  cell - 1 if x > 0 else -1, cell + 1 if x < width - 1 else -1):
+                    if neighbour < 0 or neighbour >= size or seen[neighbour] == stamp:
+                        continue
+                    if positions[neighbour] >= count and neighbour != tail:
+                        continue
+                    seen[neighbour] = stamp
+                    parent[neighbour] = cell
+                    if neighbour == goal:
+                        return self._path_to(head, goal)
+                    next_frontier.append(neighbour)
+            frontier = next_frontier
+        return None
+
+    def _path_to(self, head, goal):
+        path = []
+        parent = self._parent
+        cell = goal
+        while cell != head:
+            path.append(cell)
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+    def _tail_reachable_after(self, body, path, positions, count, grow=True):
+        """Whether the head could reach the tail after following path (and eating)."""
+        length = len(body) + grow
+        if length < 4:
+            return True  # Too short to wall itself in
+
+        # On arrival the body is the path, newest first, then the front `kept` cells of
+        # the old body. Only the path and the vacated old cells are marked; every other
+        # cell is as occupied or free as it is now.
+        self._stamp += 1
+        stamp, walls, vacated, seen = self._stamp, self._walls, self._vacated, self._seen
+        kept = length - len(path)
+        if kept > 0:
+            for cell in itertools.islice(reversed(body), len(body) - kept):
+                vacated[self._flat(cell)] = stamp
+            goal = self._flat(body[kept - 1])
+            for cell in path:
+                walls[cell] = stamp
+        else:
+            for cell in body:
+                vacated[self._flat(cell)] = stamp
+            goal = path[-length]
+            for cell in itertools.islice(path, len(path) - length + 1, None):
+                walls[cell] = stamp
+
+        start = path[-1]
+        width = self.width
+        size = len(seen)
+        seen[start] = stamp
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                x = cell % width
+                for neighbour in (cell - width, cell + width,
+                                  cell - 1 if x > 0 else -1, cell + 1 if x < width - 1 else -1):
+                    if neighbour == goal:
+                        return True
+                    if (neighbour < 0 or neighbour >= size or seen[neighbour] == stamp
+                            or walls[neighbour] == stamp
+                            or (positions[neighbour] >= count and vacated[neighbour] != stamp)):
+                        continue
+                    seen[neighbour] = stamp
+                    next_frontier.append(neighbour)
+            frontier = next_frontier
+        return False
+
+
+def play(engine, autopilot, ticks):
+    """
+    Drive engine headless for `ticks` ticks, starting a new round after each game
+    over. Returns the scores of the finished rounds.
+    """
+    scores = []
+    end = engine.tick + ticks
+    while engine.tick < end:
+        if engine.game_over:
+            scores.append(engine.score)
+            engine.reset_game()
+        direction = autopilot(engine)
+        if direction is not None:
+            engine.handle_direction(direction)
+        engine.update()
+    return scores
@@ -0,0 +1,152 @@
+import numpy as np
+from game.snake import Direction
+
+# Action codes follow the Direction declaration order: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT
+DIRECTIONS = list(Direction)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+NO_ACTION = -1
+
+DX = np.array([d.value[0] for d in DIRECTIONS], dtype=np.int32)
+DY = np.array([d.value[1] for d in DIRECTIONS], dtype=np.int32)
+OPPOSITE_CODES = np.array([1, 0, 3, 2], dtype=np.int8)
+
+
+class BatchGameEngine:
+    """
+    Headless engine that advances N independent snake games in lockstep with NumPy.
+
+    Rules mirror GameEngine.update(): a turn is ignored if it reverses the current
+    direction, leaving the playable area ends the game before moving, the tail is
+    freed before the head moves unless food is eaten, eating scores 10 and respawns
+    food on a free cell, and a snake that fills the board ends its game.
+
+    Cells are stored as flat indices y * play_width + x. Each game's body is a ring
+    buffer over body[i] with the head at head_ptr[i] and length[i] segments behind it.
+    """
+
+    def __init__(self, num_games, grid_width, grid_height, seed=None):
+        self.num_games = num_games
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        # Same playable area that GameEngine.update() enforces
+        self.play_width = grid_width - 1
+        self.play_height = grid_height - 4
+        self.num_cells = self.play_width * self.play_height
+        self.rng = np.random.default_rng(seed)
+
+        self.head_x = np.zeros(num_games, dtype=np.int32)
+        self.head_y = np.zeros(num_games, dtype=np.int32)
+        self.direction = np.zeros(num_games, dtype=np.int8)
+        self.body = np.zeros((num_games, self.num_cells), dtype=np.int32)
+        self.head_ptr = np.zeros(num_games, dtype=np.int32)
+        self.length = np.zeros(num_games, dtype=np.int32)
+        self.occupancy = np.zeros((num_games, self.num_cells), dtype=bool)
+        self.food = np.zeros(num_games, dtype=np.int32)
+        self.score = np.zeros(num_games, dtype=np.int32)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.board_full = np.zeros(num_games, dtype=bool)
+
+        self.reset()
+
+    def reset(self, games=None):
+        """Start new games. games is an index array or bool mask; default resets all."""
+        if games is None:
+            games = np.arange(self.num_games)
+        games = np.asarray(games)
+        if games.dtype == bool:
+            games = np.flatnonzero(games)
+        if games.size == 0:
+            return
+
+        start_x, start_y = self.play_width // 2, self.play_height // 2
+        start = start_y * self.play_width + start_x
+        self.head_x[games] = start_x
+        self.head_y[games] = start_y
+        self.direction[games] = DIRECTION_CODES[Direction.RIGHT]
+        self.head_ptr[games] = 0
+        self.body[games, 0] = start
+        self.length[games] = 1
+        self.occupancy[games] = False
+        self.occupancy[games, start] = True
+        self.score[games] = 0
+        self.done[games] = False
+        self.board_full[games] = False
+        self._spawn_food(games)
+
+    def _spawn_food(self, games):
+        """Place food on a uniformly random free cell of each game in games."""
+        full = self.length[games] >= self.num_cells
+        if full.any():
+            self.food[games[full]] = -1
+            self.board_full[games[full]] = True
+            self.done[games[full]] = True
+            games = games[~full]
+        if games.size == 0:
+            return
+        # Random key per cell, occupied cells pushed below every free one
+        keys = self.rng.random((games.size, self.num_cells))
+        keys[self.occupancy[games]] = -1.0
+        self.food[games] = keys.argmax(axis=1)
+
+    def step(self, actions):
+        """
+        Advance every running game by one tick.
+
+        actions: int array of shape (num_games,) with a direction code per game, or
+        NO_ACTION to keep going straight. Returns (rewards, dones): the score gained
+        this tick and the done flag of every game. Finished games are left untouched
+        until reset().
+        """
+        actions = np.asarray(actions, dtype=np.int8)
+        active = ~self.done
+        rewards = np.zeros(self.num_games, dtype=np.int32)
+
+        turn = active & (actions >= 0) & (actions != OPPOSITE_CODES[self.direction])
+        self.direction[turn] = actions[turn]
+
+        next_x = self.head_x + DX[self.direction]
+        next_y = self.head_y + DY[self.direction]
+        out_of_bounds = active & (
+            (next_x < 0) | (next_x >= self.play_width) | (next_y < 0) | (next_y >= self.play_height)
+        )
+        self.done[out_of_bounds] = True
+
+        games = np.flatnonzero(active & ~out_of_bounds)
+        if games.size == 0:
+            return rewards, self.done.copy()
+        next_cell = next_y[games] * self.play_width + next_x[games]
+        ate = next_cell == self.food[games]
+
+        # Free the tail first so the head may follow it into the vacated cell
+        movers = games[~ate]
+        tail_ptr = (self.head_ptr[movers] - self.length[movers] + 1) % self.num_cells
+        self.occupancy[movers, self.body[movers, tail_ptr]] = False
+
+        collided = self.occupancy[games, next_cell]
+
+        self.head_ptr[games] = (self.head_ptr[games] + 1) % self.num_cells
+        self.body[games, self.head_ptr[games]] = next_cell
+        self.occupancy[games, next_cell] = True
+        self.head_x[games] = next_x[games]
+        self.head_y[games] = next_y[games]
+        self.length[games] += ate
+
+        eaters = games[ate]
+        self.score[eaters] += 10
+        rewards[eaters] = 10
+        self._spawn_food(eaters)
+
+        self.done[games[collided]] = True
+        return rewards, self.done.copy()
+
+    def snake_body(self, game):
+        """Return one game's body as a list of (x, y) tuples, head first."""
+        ptrs = (self.head_ptr[game] - np.arange(self.length[game])) % self.num_cells
+        return [(int(c % self.play_width), int(c // self.play_width)) for c in self.body[game, ptrs]]
+
+    def food_position(self, game):
+        """Return one game's food as (x, y), or None when its board is full."""
+        cell = int(self.food[game])
+        if cell < 0:
+            return None
+        return (cell % self.play_width, cell // self.play_width)
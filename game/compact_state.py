@@ -0,0 +1,196 @@
+"""
+Compact snake state for very large boards.
+
+Snake keeps its body as a deque of (x, y) tuples plus a set of the same tuples,
+which costs well over 100 bytes per segment. CompactSnake has the same interface
+but stores the body as two array('H') ring buffers (4 bytes per segment) and
+occupancy as a packed bit grid (1 bit per cell). Its `body` is a read-only view
+that yields (x, y) tuples on demand, so Renderer and GameEngine work unchanged.
+
+This is an experiment measured by benchmarks/bench_compact_state.py, not an engine
+option: GameEngine's free-cell index still takes 4 to 8 bytes per board cell, so
+swapping only the snake does not make a large board cheap.
+"""
+from array import array
+from collections import deque
+
+from game.snake import Direction, OPPOSITE
+
+
+class BitGrid:
+    """width x height booleans packed 8 per byte."""
+
+    __slots__ = ('width', 'height', 'bits')
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.bits = bytearray((width * height + 7) // 8)
+
+    def __contains__(self, cell):
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        i = y * self.width + x
+        return self.bits[i >> 3] & (1 << (i & 7)) != 0
+
+    def set(self, cell):
+        i = cell[1] * self.width + cell[0]
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def clear(self, cell):
+        i = cell[1] * self.width + cell[0]
+        self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def reset(self):
+        self.bits[:] = bytes(len(self.bits))
+
+
+class BodyView:
+    """Read-only sequence over a CompactSnake's body, head first, like Snake.body."""
+
+    __slots__ = ('_snake',)
+
+    def __init__(self, snake):
+        self._snake = snake
+
+    def __len__(self):
+        return self._snake.length
+
+    def __getitem__(self, index):
+        snake = self._snake
+        if index < 0:
+            index += snake.length
+        if not 0 <= index < snake.length:
+            raise IndexError("body index out of range")
+        slot = (snake.head_slot + index) % snake.capacity
+        return (snake.xs[slot], snake.ys[slot])
+
+    def __iter__(self):
+        snake = self._snake
+        xs, ys, capacity = snake.xs, snake.ys, snake.capacity
+        start = snake.head_slot
+        end = start + snake.length
+        # At most two contiguous runs of the ring
+        for slot in range(start, min(end, capacity)):
+            yield (xs[slot], ys[slot])
+        for slot in range(0, max(0, end - capacity)):
+            yield (xs[slot], ys[slot])
+
+
+class CompactSnake:
+    """
+    Drop-in replacement for Snake backed by ring buffers and a bit grid. Unlike
+    Snake it cannot store off-board cells, so callers must check the bounds before
+    move(), as GameEngine does.
+    """
+
+    __slots__ = ('grid_width', 'grid_height', 'capacity', 'xs', 'ys', 'head_slot', 'length',
+                 'grid', 'body', 'direction', 'next_direction', 'prev_head', 'last_tail',
+                 'collided', 'direction_queue', 'max_queued_turns')
+
+    def __init__(self, grid_width, grid_height):
+        if grid_width > 0xFFFF or grid_height > 0xFFFF:
+            raise ValueError("CompactSnake coordinates are limited to 16 bits")
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        # One slot per cell: the snake can never be longer than the board
+        self.capacity = grid_width * grid_height
+        self.xs = array('H', bytes(2 * self.capacity))
+        self.ys = array('H', bytes(2 * self.capacity))
+        self.grid = BitGrid(grid_width, grid_height)
+        self.body = BodyView(self)
+        self.head_slot = 0
+        self.length = 0
+        self.set_body([(grid_width // 2, grid_height // 2)])
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.prev_head = None
+        self.last_tail = None
+        self.collided = False
+        self.direction_queue = deque()
+        self.max_queued_turns = 3
+
+    def set_body(self, cells):
+        """Replace the body with cells, head first."""
+        self.grid.reset()
+        self.head_slot = 0
+        self.length = 0
+        for cell in cells:
+            if self.length == self.capacity:
+                raise ValueError("body is longer than the board")
+            self.xs[self.length], self.ys[self.length] = cell
+            self.grid.set(cell)
+            self.length += 1
+        self.collided = False
+
+    def queue_direction(self, direction):
+        """Buffer a turn. Ignores repeats and reversals of the last queued direction."""
+        if len(self.direction_queue) >= self.max_queued_turns:
+            return False
+        last = self.direction_queue[-1] if self.direction_queue else self.direction
+        if direction == last or direction == OPPOSITE[last]:
+            return False
+        self.direction_queue.append(direction)
+        return True
+
+    def apply_queued_direction(self):
+        """Pop the next buffered turn into next_direction. Called once per tick."""
+        if self.direction_queue:
+            self.next_direction = self.direction_queue.popleft()
+
+    @property
+    def head(self):
+        slot = self.head_slot
+        return (self.xs[slot], self.ys[slot])
+
+    def occupies(self, cell):
+        return cell in self.grid
+
+    def move(self, grow=True):
+        """
+        Push a new head in the current direction. With grow=False the tail is
+        freed first, so the head may follow it into the vacated cell.
+        Returns True if the new head landed on the snake's own body.
+        """
+        self.direction = self.next_direction
+        dx, dy = self.direction.value
+        xs, ys, bits, width = self.xs, self.ys, self.grid.bits, self.grid_width
+        slot = self.head_slot
+        head_x, head_y = xs[slot], ys[slot]
+        self.prev_head = (head_x, head_y)
+        self.last_tail = None if grow else self.remove_tail()
+
+        # Inlined BitGrid lookups: this is the hot path on large boards
+        new_x, new_y = head_x + dx, head_y + dy
+        i = new_y * width + new_x
+        mask = 1 << (i & 7)
+        if bits[i >> 3] & mask:
+            # The body keeps the head twice, as Snake does; the game is over anyway
+            self.collided = True
+        else:
+            bits[i >> 3] |= mask
+        slot = (slot - 1) % self.capacity
+        xs[slot] = new_x
+        ys[slot] = new_y
+        self.head_slot = slot
+        self.length += 1
+        return self.collided
+
+    def remove_tail(self):
+        """Pop and return the tail cell."""
+        slot = (self.head_slot + self.length - 1) % self.capacity
+        tail = (self.xs[slot], self.ys[slot])
+        self.length -= 1
+        self.grid.clear(tail)
+        return tail
+
+    def grow(self):
+        pass  # Body already extended by move()
+
+    def check_collision(self):
+        head = self.head
+        # Check wall collision
+        if head[0] < 1 or head[0] >= self.grid_width or head[1] < 1 or head[1] >= self.grid_height:
+            return True
+        return self.collided
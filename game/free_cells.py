@@ -0,0 +1,70 @@
+from array import array
+
+
+class FreeCellIndex:
+    """
+    Set of free cells on a width x height board with O(1) add, remove and random pick.
+
+    cells is a permutation of every flat cell index where cells[:count] are the free
+    ones; positions maps a cell back to its slot so a cell can be swap-moved across
+    the boundary in constant time. Both use 2-byte slots when those can address the
+    whole board (up to 65536 cells), 4-byte slots otherwise.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        size = width * height
+        typecode = 'H' if size <= 0x10000 else 'I'
+        self.cells = array(typecode, range(size))
+        self.positions = array(typecode, range(size))
+        self.count = size
+
+    def __len__(self):
+        return self.count
+
+    def _flat(self, cell):
+        x, y = cell
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+
+    def __contains__(self, cell):
+        flat = self._flat(cell)
+        return flat is not None and self.positions[flat] < self.count
+
+    def _swap(self, i, j):
+        cells, positions = self.cells, self.positions
+        a, b = cells[i], cells[j]
+        cells[i], cells[j] = b, a
+        positions[a], positions[b] = j, i
+
+    def remove(self, cell):
+        """Mark cell as occupied. No-op if it is already occupied or off the board."""
+        flat = self._flat(cell)
+        if flat is None or self.positions[flat] >= self.count:
+            return
+        self.count -= 1
+        self._swap(self.positions[flat], self.count)
+
+    def add(self, cell):
+        """Mark cell as free. No-op if it is already free or off the board."""
+        flat = self._flat(cell)
+        if flat is None or self.positions[flat] < self.count:
+            return
+        self._swap(self.positions[flat], self.count)
+        self.count += 1
+
+    def restore(self, cells, count):
+        """Load a saved cells permutation and free count, e.g. from a snapshot."""
+        self.cells = array(self.cells.typecode, cells)
+        for i, cell in enumerate(self.cells):
+            self.positions[cell] = i
+        self.count = count
+
+    def choice(self, rng):
+        """Return a uniformly random free cell, or None when the board is full."""
+        if self.count == 0:
+            return None
+        flat = self.cells[rng.randrange(self.count)]
+        return (flat % self.width, flat // self.width)
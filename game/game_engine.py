@@ -1,14 +1,37 @@
-import pygame
-from game.snake import Snake, Food, Direction
+import random
+from game.free_cells import FreeCellIndex
+from game.snake import Snake, Food, Direction, OPPOSITE
+
+def key_direction(keys):
+    """Direction of the first held arrow key in UP, DOWN, LEFT, RIGHT order, or None."""
+    # Imported here so headless engines (bots, replays) never load pygame
+    import pygame
+    if keys[pygame.K_UP]:
+        return Direction.UP
+    elif keys[pygame.K_DOWN]:
+        return Direction.DOWN
+    elif keys[pygame.K_LEFT]:
+        return Direction.LEFT
+    elif keys[pygame.K_RIGHT]:
+        return Direction.RIGHT
+    return None
 
 class GameEngine:
-    def __init__(self, grid_width, grid_height, reverse_gesture_direction=False):
+    # Built by reset_game(); benchmarks substitute CompactSnake here
+    snake_class = Snake
+
+    def __init__(self, grid_width, grid_height, reverse_gesture_direction=False, seed=None):
         self.grid_width = grid_width
         self.grid_height = grid_height
-        self.snake = Snake(grid_width, grid_height)
-        self.food = Food(grid_width, grid_height)
-        self.score = 0
-        self.game_over = False
+        # Cells the snake may occupy: update() ends the game outside these bounds
+        self.play_width = grid_width - 1
+        self.play_height = grid_height - 4
+        self.rng = random.Random(seed)
+        # Ticks simulated since the engine was created; keeps counting across rounds
+        self.tick = 0
+        # Optional GameRecorder notified of turns, ticks and resets
+        self.recorder = None
+        self.reset_game()
         self.reverse_gesture_direction = reverse_gesture_direction
         
         # Skin options
@@ -30,14 +53,13 @@ class GameEngine:
             self.food_color = self.skins[skin_name]['food']
 
     def handle_input(self, keys):
-        if keys[pygame.K_UP] and self.snake.direction != Direction.DOWN:
-            self.snake.next_direction = Direction.UP
-        elif keys[pygame.K_DOWN] and self.snake.direction != Direction.UP:
-            self.snake.next_direction = Direction.DOWN
-        elif keys[pygame.K_LEFT] and self.snake.direction != Direction.RIGHT:
-            self.snake.next_direction = Direction.LEFT
-        elif keys[pygame.K_RIGHT] and self.snake.direction != Direction.LEFT:
-            self.snake.next_direction = Direction.RIGHT
+        direction = key_direction(keys)
+        if direction is not None:
+            self.snake.queue_direction(direction)
+
+    def handle_direction(self, direction):
+        """Queue a turn from a non-gesture controller (keyboard, bot, socket)."""
+        self.snake.queue_direction(direction)
 
     def handle_gesture(self, gesture):
         """Handle gesture input from gesture detector."""
@@ -46,54 +68,61 @@ class GameEngine:
             gesture = self._reverse_direction(gesture)
         
         if isinstance(gesture, Direction):
-            if gesture == Direction.UP and self.snake.direction != Direction.DOWN:
-                self.snake.next_direction = Direction.UP
-            elif gesture == Direction.DOWN and self.snake.direction != Direction.UP:
-                self.snake.next_direction = Direction.DOWN
-            elif gesture == Direction.LEFT and self.snake.direction != Direction.RIGHT:
-                self.snake.next_direction = Direction.LEFT
-            elif gesture == Direction.RIGHT and self.snake.direction != Direction.LEFT:
-                self.snake.next_direction = Direction.RIGHT
+            self.snake.queue_direction(gesture)
 
     def _reverse_direction(self, direction):
         """Reverse the direction for opposite control."""
-        reverse_map = {
-            Direction.UP: Direction.DOWN,
-            Direction.DOWN: Direction.UP,
-            Direction.LEFT: Direction.RIGHT,
-            Direction.RIGHT: Direction.LEFT
-        }
-        return reverse_map.get(direction, direction)
+        return OPPOSITE.get(direction, direction)
 
     def update(self):
         if not self.game_over:
-            # Check if next move would go out of bounds
-            dx, dy = self.snake.next_direction.value
-            head_x, head_y = self.snake.body[0]
-            next_head = (head_x + dx, head_y + dy)
-            
-            # Game over if moving outside bounds
-            if (next_head[0] < 0 or next_head[0] >= self.grid_width - 1 or
-                next_head[1] < 0 or next_head[1] >= self.grid_height - 4):
-                self.game_over = True
-                return
-            
-            self.snake.next_direction = self.snake.next_direction
-            self.snake.move()
-            
-            # Check food collision
-            if self.snake.body[0] == self.food.position:
-                self.score += 10
-                self.food.position = self.food.spawn()
-            else:
-                self.snake.body.pop()
-            
-            # Check self-collision
-            if self.snake.body[0] in self.snake.body[1:]:
+            self.tick += 1
+            self.snake.apply_queued_direction()
+            if self.recorder is not None and self.snake.next_direction != self.snake.direction:
+                self.recorder.record_turn(self.tick, self.snake.next_direction)
+            self._step()
+            if self.recorder is not None:
+                self.recorder.record_tick(self)
+
+    def _step(self):
+        # Check if next move would go out of bounds
+        dx, dy = self.snake.next_direction.value
+        head_x, head_y = self.snake.head
+        next_head = (head_x + dx, head_y + dy)
+        
+        # Game over if moving outside bounds
+        if (next_head[0] < 0 or next_head[0] >= self.play_width or
+            next_head[1] < 0 or next_head[1] >= self.play_height):
+            self.game_over = True
+            return
+        
+        # Check food collision; without food the tail is freed before moving
+        # so the head may follow it into the vacated cell
+        ate_food = next_head == self.food.position
+        collided = self.snake.move(grow=ate_food)
+        if self.snake.last_tail is not None:
+            self.free_cells.add(self.snake.last_tail)
+        self.free_cells.remove(self.snake.head)
+        
+        if ate_food:
+            self.score += 10
+            self.food.position = self.food.spawn()
+            if self.food.position is None:
+                # No free cell left: the snake fills the board
+                self.board_full = True
                 self.game_over = True
+        
+        # Check self-collision
+        if collided:
+            self.game_over = True
 
     def reset_game(self):
-        self.snake = Snake(self.grid_width, self.grid_height)
-        self.food = Food(self.grid_width, self.grid_height)
+        self.snake = self.snake_class(self.play_width, self.play_height)
+        self.free_cells = FreeCellIndex(self.play_width, self.play_height)
+        self.free_cells.remove(self.snake.head)
+        self.food = Food(self.play_width, self.play_height, self.free_cells, self.rng)
         self.score = 0
         self.game_over = False
+        self.board_full = False
+        if self.recorder is not None:
+            self.recorder.record_reset(self)
@@ -0,0 +1,293 @@
+"""
+Deterministic recording, snapshots and fast-forward replay of GameEngine sessions.
+
+Because the engine's only randomness is its own seeded random.Random, a session is
+fully described by where it started and which turns were taken on which tick. A
+recording file is an append-only stream of records after a fixed header:
+
+    b'T' + TURN          the snake's next_direction changed on this tick
+    b'S' + u32 length    a snapshot of the complete engine state (see
+         + snapshot      snapshot_engine), written every snapshot_interval ticks
+    b'R' + u32 length    a snapshot written when a new round starts
+         + snapshot
+
+Snapshots are packed with struct/array, never pickled, so they are compact and
+safe to load.
+"""
+import bisect
+import random
+import struct
+from array import array
+
+from game.game_engine import GameEngine
+from game.snake import Direction, OPPOSITE
+
+DIRECTIONS = list(Direction)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+FILE_MAGIC = b'SGRC'
+SNAPSHOT_MAGIC = b'SGSS'
+FORMAT_VERSION = 1
+# magic, version, grid width, grid height, snapshot interval
+FILE_HEADER = struct.Struct('<4sHHHI')
+TURN = struct.Struct('<IB')
+LENGTH = struct.Struct('<I')
+# magic, version, tick, score, play width, play height, direction, next direction,
+# game over, board full, food x, food y (-1 when none), body length. Followed by the
+# body as array('H') x, y pairs, the free-cell count and permutation as array('I'),
+# then the RNG state.
+SNAPSHOT_HEADER = struct.Struct('<4sHIIHHBBBBhhI')
+# random.Random state: version, gauss_next flag, gauss_next
+RNG_HEADER = struct.Struct('<BBd')
+
+
+def snapshot_engine(engine):
+    """Serialize the complete simulation state of engine to bytes."""
+    snake = engine.snake
+    food = engine.food.position
+    food_x, food_y = food if food is not None else (-1, -1)
+    parts = [SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, FORMAT_VERSION, engine.tick, engine.score,
+        engine.play_width, engine.play_height,
+        DIRECTION_CODES[snake.direction], DIRECTION_CODES[snake.next_direction],
+        engine.game_over, engine.board_full, food_x, food_y, len(snake.body),
+    )]
+
+    coords = array('H')
+    for x, y in snake.body:
+        coords.append(x)
+        coords.append(y)
+    parts.append(coords.tobytes())
+
+    # The free-cell permutation decides which cell a random index picks, so it is
+    # part of the deterministic state
+    cells = engine.free_cells.cells
+    parts.append(LENGTH.pack(engine.free_cells.count))
+    parts.append((cells if cells.typecode == 'I' else array('I', cells)).tobytes())
+
+    version, internal, gauss_next = engine.rng.getstate()
+    parts.append(RNG_HEADER.pack(version, gauss_next is not None, gauss_next or 0.0))
+    parts.append(array('I', internal).tobytes())
+    return b''.join(parts)
+
+
+def restore_engine(engine, data):
+    """Load a snapshot produced by snapshot_engine into engine, in place."""
+    (magic, version, tick, score, play_width, play_height, direction, next_direction,
+     game_over, board_full, food_x, food_y, length) = SNAPSHOT_HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a version %d game snapshot" % FORMAT_VERSION)
+    if (play_width, play_height) != (engine.play_width, engine.play_height):
+        raise ValueError("snapshot is for a %dx%d board, engine has %dx%d"
+                         % (play_width, play_height, engine.play_width, engine.play_height))
+    offset = SNAPSHOT_HEADER.size
+
+    coords = array('H')
+    coords.frombytes(data[offset:offset + 4 * length])
+    offset += 4 * length
+    body = list(zip(coords[0::2], coords[1::2]))
+
+    (free_count,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    cells = array('I')
+    cells_size = 4 * play_width * play_height
+    cells.frombytes(data[offset:offset + cells_size])
+    offset += cells_size
+
+    rng_version, has_gauss, gauss_next = RNG_HEADER.unpack_from(data, offset)
+    offset += RNG_HEADER.size
+    internal = array('I')
+    internal.frombytes(data[offset:])
+
+    # Rebuild a fresh round, then overwrite its state (reset_game draws from the RNG,
+    # so the RNG state is restored afterwards)
+    recorder, engine.recorder = engine.recorder, None
+    engine.reset_game()
+    engine.recorder = recorder
+    engine.rng.setstate((rng_version, tuple(internal), gauss_next if has_gauss else None))
+    snake = engine.snake
+    snake.set_body(body)
+    engine.free_cells.restore(cells, free_count)
+    snake.prev_head = body[1] if len(body) > 1 else None
+    snake.direction = DIRECTIONS[direction]
+    snake.next_direction = DIRECTIONS[next_direction]
+    engine.food.position = (food_x, food_y) if food_x >= 0 else None
+    engine.tick = tick
+    engine.score = score
+    engine.game_over = bool(game_over)
+    engine.board_full = bool(board_full)
+
+
+class GameRecorder:
+    """
+    Attach to a GameEngine (engine.recorder = recorder) to append its turns and
+    periodic snapshots to a recording file.
+    """
+
+    def __init__(self, path, engine, snapshot_interval=1000):
+        self.snapshot_interval = snapshot_interval
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION, engine.grid_width,
+                                          engine.grid_height, snapshot_interval))
+        engine.recorder = self
+        self.record_reset(engine)
+
+    def record_turn(self, tick, direction):
+        self._file.write(b'T' + TURN.pack(tick, DIRECTION_CODES[direction]))
+
+    def record_tick(self, engine):
+        if engine.tick % self.snapshot_interval == 0:
+            self._write_snapshot(b'S', engine)
+
+    def record_reset(self, engine):
+        self._write_snapshot(b'R', engine)
+
+    def _write_snapshot(self, kind, engine):
+        data = snapshot_engine(engine)
+        self._file.write(kind + LENGTH.pack(len(data)) + data)
+
+    def close(self):
+        self._file.close()
+
+
+class GameRecording:
+    """A recording file parsed into turn arrays and snapshots, both ordered by tick."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.grid_width, self.grid_height, self.snapshot_interval = \
+            FILE_HEADER.unpack_from(data, 0)
+        if magic != FILE_MAGIC or version != FORMAT_VERSION:
+            raise ValueError("%s is not a version %d game recording" % (path, FORMAT_VERSION))
+
+        self.turn_ticks = array('I')
+        self.turn_directions = array('B')
+        self.snapshot_ticks = array('I')
+        self.snapshot_is_reset = array('B')
+        self.snapshots = []
+        offset = FILE_HEADER.size
+        end = len(data)
+        while offset < end:
+            kind = data[offset:offset + 1]
+            offset += 1
+            if kind == b'T':
+                if offset + TURN.size > end:
+                    break  # Truncated tail from a crash; everything before it is valid
+                tick, code = TURN.unpack_from(data, offset)
+                offset += TURN.size
+                self.turn_ticks.append(tick)
+                self.turn_directions.append(code)
+            elif kind in (b'S', b'R'):
+                if offset + LENGTH.size > end:
+                    break
+                (length,) = LENGTH.unpack_from(data, offset)
+                offset += LENGTH.size
+                if offset + length > end:
+                    break
+                snapshot = data[offset:offset + length]
+                offset += length
+                self.snapshot_ticks.append(SNAPSHOT_HEADER.unpack_from(snapshot, 0)[2])
+                self.snapshot_is_reset.append(kind == b'R')
+                self.snapshots.append(snapshot)
+            else:
+                raise ValueError("corrupt record at byte %d of %s" % (offset - 1, path))
+
+    @property
+    def last_tick(self):
+        last = self.snapshot_ticks[-1] if self.snapshot_ticks else 0
+        return max(last, self.turn_ticks[-1] if self.turn_ticks else 0)
+
+
+class Replayer:
+    """Reconstructs the engine state at any tick of a recording, without rendering."""
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.engine = GameEngine(recording.grid_width, recording.grid_height)
+
+    def seek(self, tick, before_reset=False):
+        """
+        Return the engine as it was right after tick `tick` was simulated.
+
+        A round that ends is reset without advancing the tick, so the game over and
+        the next round share a tick. By default seek returns the new round; with
+        before_reset=True it returns the finished one, e.g. to inspect a collision.
+        """
+        recording = self.recording
+        # Latest snapshot at or before the target; a round reset at the same tick wins
+        index = bisect.bisect_right(recording.snapshot_ticks, tick) - 1
+        if before_reset:
+            while (index >= 0 and recording.snapshot_ticks[index] == tick
+                   and recording.snapshot_is_reset[index]):
+                index -= 1
+        if index < 0:
+            raise ValueError("tick %d is before the first snapshot" % tick)
+        engine = self.engine
+        restore_engine(engine, recording.snapshots[index])
+        self._fast_forward(tick)
+        return engine
+
+    def _fast_forward(self, tick):
+        engine = self.engine
+        snake = engine.snake
+        turn_ticks = self.recording.turn_ticks
+        turn_directions = self.recording.turn_directions
+        next_turn = bisect.bisect_right(turn_ticks, engine.tick)
+        turn_count = len(turn_ticks)
+        update = engine.update
+
+        while engine.tick < tick and not engine.game_over:
+            if next_turn < turn_count and turn_ticks[next_turn] == engine.tick + 1:
+                snake.next_direction = DIRECTIONS[turn_directions[next_turn]]
+                next_turn += 1
+            update()
+
+    def verify(self):
+        """
+        Re-simulate every stretch between consecutive snapshots and check it lands
+        exactly on the next periodic snapshot, or stops at the tick of the next round
+        reset. Returns the number of ticks re-simulated.
+        """
+        recording = self.recording
+        engine = self.engine
+        simulated = 0
+        for i in range(len(recording.snapshots) - 1):
+            start, stop = recording.snapshot_ticks[i], recording.snapshot_ticks[i + 1]
+            restore_engine(engine, recording.snapshots[i])
+            self._fast_forward(stop)
+            simulated += engine.tick - start
+            if engine.tick != stop or (not recording.snapshot_is_reset[i + 1]
+                                       and snapshot_engine(engine) != recording.snapshots[i + 1]):
+                raise AssertionError("replay diverged between ticks %d and %d" % (start, stop))
+        return simulated
+
+
+def _is_safe(engine, direction):
+    head_x, head_y = engine.snake.head
+    dx, dy = direction.value
+    cell = (head_x + dx, head_y + dy)
+    return (0 <= cell[0] < engine.play_width and 0 <= cell[1] < engine.play_height
+            and (not engine.snake.occupies(cell) or cell == engine.snake.body[-1]))
+
+
+def random_session(path, grid_width=40, grid_height=30, ticks=100000, seed=0, turn_rate=0.2,
+                   snapshot_interval=1000):
+    """
+    Record a long synthetic session driven by a random player that turns at random
+    and dodges walls and its own body when it can see them one cell ahead.
+    """
+    engine = GameEngine(grid_width, grid_height, seed=seed)
+    recorder = GameRecorder(path, engine, snapshot_interval)
+    player = random.Random(seed + 1)
+    while engine.tick < ticks:
+        if engine.game_over:
+            engine.reset_game()
+        snake = engine.snake
+        if player.random() < turn_rate or not _is_safe(engine, snake.direction):
+            safe = [d for d in DIRECTIONS if d != OPPOSITE[snake.direction] and _is_safe(engine, d)]
+            if safe:
+                snake.queue_direction(player.choice(safe))
+        engine.update()
+    recorder.close()
+    return engine
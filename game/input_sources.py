@@ -0,0 +1,160 @@
+"""
+Pluggable asyncio input sources.
+
+Every source is a task that puts (source name, Direction) pairs on one shared
+asyncio.Queue; the game loop drains that queue into GameEngine. A slow source only
+ever delays itself: sources never block the event loop, so ticks and rendering
+keep their schedule whatever the webcam or network is doing.
+
+To add a controller, subclass InputSource and implement run(queue).
+"""
+import asyncio
+
+from game.game_engine import key_direction
+from game.profiler import Profiler
+from game.snake import Direction
+
+
+class InputSource:
+    """Base class: run(queue) is started as a task and cancelled on shutdown."""
+
+    name = 'input'
+
+    async def run(self, queue):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class KeyboardSource(InputSource):
+    """
+    Polls held arrow keys, like GameEngine.handle_input did every frame.
+    The pygame event queue is pumped by the render task; this only reads key state.
+    """
+
+    name = 'keyboard'
+
+    def __init__(self, interval=1 / 60):
+        self.interval = interval
+
+    async def run(self, queue):
+        import pygame
+        while True:
+            direction = key_direction(pygame.key.get_pressed())
+            if direction is not None:
+                await queue.put((self.name, direction))
+            await asyncio.sleep(self.interval)
+
+
+class GestureSource(InputSource):
+    """
+    Forwards directions from a GestureStack. Capture and inference already run on
+    their own threads, so polling is a non-blocking mailbox read.
+    """
+
+    name = 'gesture'
+
+    def __init__(self, gesture_stack, interval=0.005, profiler=None):
+        self.gesture_stack = gesture_stack
+        self.interval = interval
+        self.profiler = profiler or Profiler()
+
+    async def run(self, queue):
+        stage = self.profiler.stage('gesture.poll')
+        while True:
+            with stage:
+                direction = self.gesture_stack.poll_direction()
+            if direction is not None:
+                await queue.put((self.name, direction))
+            await asyncio.sleep(self.interval)
+
+
+class BotSource(InputSource):
+    """Asks policy(engine) for a Direction (or None) every `interval` seconds."""
+
+    name = 'bot'
+
+    def __init__(self, engine, policy, interval=0.02):
+        self.engine = engine
+        self.policy = policy
+        self.interval = interval
+
+    async def run(self, queue):
+        while True:
+            direction = self.policy(self.engine)
+            if direction is not None:
+                await queue.put((self.name, direction))
+            await asyncio.sleep(self.interval)
+
+
+class BotGroupSource(InputSource):
+    """
+    Several bot policies driven from one task, e.g. one per arena snake. Each
+    direction is queued under its policy's name. Policies decide once per tick
+    and return None otherwise, so polling them all costs little between ticks.
+    """
+
+    name = 'bots'
+
+    def __init__(self, engine, policies, interval=0.02):
+        """policies: source name -> policy(engine), polled in this order."""
+        self.engine = engine
+        self.policies = list(policies.items())
+        self.interval = interval
+
+    async def run(self, queue):
+        while True:
+            for name, policy in self.policies:
+                direction = policy(self.engine)
+                if direction is not None:
+                    await queue.put((name, direction))
+            await asyncio.sleep(self.interval)
+
+
+class SocketSource(InputSource):
+    """
+    Local TCP controller for scripted play and load tests. Clients send one
+    direction name per line (UP, DOWN, LEFT or RIGHT) and get back "ok" or
+    "error <reason>" once the direction is queued. port=0 picks a free port,
+    available as .port once the server is listening.
+    """
+
+    name = 'socket'
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.received = 0
+        self._server = None
+
+    async def run(self, queue):
+        async def handle(reader, writer):
+            self.connections += 1
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    name = line.decode('ascii', 'replace').strip().upper()
+                    if name not in Direction.__members__:
+                        writer.write(b'error unknown direction\n')
+                    else:
+                        await queue.put((self.name, Direction[name]))
+                        self.received += 1
+                        writer.write(b'ok\n')
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_server(handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
@@ -0,0 +1,248 @@
+"""
+Persistent high-score leaderboard.
+
+Every finished game is appended to a binary log of fixed-size records after a
+small header:
+
+    f64 timestamp, u32 score, 16-byte UTF-8 player name (NUL padded)
+
+The log is only ever appended to, so a crash can at worst leave a partial record
+at the end, which is dropped on the next load. Queries are served from memory: a
+min-heap of the `capacity` best games for top-N lookups and a dict of each
+player's best game. Records in neither can never be shown again; once the log
+holds `compact_ratio` times more records than that, it is rewritten with only
+the live ones.
+
+One writer thread owns the file: it loads the log, then appends submitted games
+in batches and publishes the new top list. The game thread only queues games and
+reads what was last published, so it never waits for the disk or a lock.
+"""
+import heapq
+import os
+import queue
+import struct
+import threading
+import time
+
+FILE_MAGIC = b'SGLB'
+FORMAT_VERSION = 1
+# magic, version
+FILE_HEADER = struct.Struct('<4sH')
+# timestamp, score, player name
+RECORD = struct.Struct('<dI16s')
+NAME_BYTES = 16
+
+
+def encode_name(player):
+    """Player name as stored in the log: at most NAME_BYTES of UTF-8."""
+    data = player.encode('utf-8')[:NAME_BYTES]
+    # Never keep half of a multi-byte character
+    return data.decode('utf-8', 'ignore').encode('utf-8')
+
+
+class Leaderboard:
+    """
+    Top-N and per-player best scores backed by an append-only log at `path`.
+    Until ready is True the log is still loading and lookups return nothing.
+    """
+
+    def __init__(self, path, capacity=100, batch_size=512, batch_delay=0.05,
+                 compact_ratio=4, min_compact_records=10000, durable=False):
+        """
+        capacity: how many of the best games top() can return.
+        batch_delay: how long the writer waits for more games before appending.
+        durable: fsync after every batch, not just after compaction.
+        """
+        self.path = path
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.compact_ratio = compact_ratio
+        self.min_compact_records = min_compact_records
+        self.durable = durable
+        self.records = 0  # Records currently in the log file
+        self.compactions = 0
+        self.error = None
+        self._heap = []  # (score, -seq, timestamp, name); the weakest kept game first
+        self._bests = {}  # name -> (score, seq, timestamp)
+        self._top = ()  # Published (name, score) pairs, best first
+        self._seq = 0  # Order of games in the log; earlier wins ties
+        self._file = None
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='leaderboard-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, player, score, timestamp=None):
+        """Queue a finished game; it is written and ranked by the writer thread."""
+        if not 0 <= score <= 0xFFFFFFFF:
+            raise ValueError(f"score {score} does not fit the log")
+        if self.error is None:
+            self._queue.put((time.time() if timestamp is None else timestamp, score, encode_name(player)))
+
+    def top(self, n=10):
+        """The n best (name, score) pairs, best first."""
+        return self._top[:n]
+
+    def best(self, player):
+        """The player's best score, or None if they have no finished game."""
+        best = self._bests.get(encode_name(player).decode('utf-8'))
+        return None if best is None else best[0]
+
+    def flush(self, timeout=None):
+        """Block until every game submitted so far is written. Returns False on timeout."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Write the remaining queued games and stop the writer."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            self._load()
+        except Exception as exc:
+            self.error = exc
+        self._ready.set()
+        closing = False
+        while not closing:
+            batch = self._next_batch()
+            records = []
+            for item in batch:
+                if item is None:
+                    closing = True
+                elif isinstance(item, tuple):
+                    timestamp, score, name = item
+                    records.append(RECORD.pack(timestamp, score, name))
+                    self._add(score, timestamp, name.decode('utf-8'))
+            if records and self.error is None:
+                try:
+                    self._append(records)
+                except Exception as exc:
+                    self.error = exc
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _next_batch(self):
+        """Wait for one item, then gather more for up to batch_delay seconds."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.batch_delay
+        # Flush requests and shutdown end a batch early
+        while len(batch) < self.batch_size and isinstance(batch[-1], tuple):
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _add(self, score, timestamp, name):
+        seq = self._seq
+        self._seq += 1
+        entry = (score, -seq, timestamp, name)
+        heap = self._heap
+        if len(heap) < self.capacity:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+        best = self._bests.get(name)
+        if best is None or score > best[0]:
+            self._bests[name] = (score, seq, timestamp)
+
+    def _publish(self):
+        # A new tuple is swapped in whole, so readers never see a half-built list
+        self._top = tuple((name, score) for score, _, _, name in sorted(self._heap, reverse=True))
+
+    def _load(self):
+        header_size = FILE_HEADER.size
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'wb') as f:
+                f.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION))
+            self._file = open(self.path, 'ab')
+            return
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        if len(data) < header_size or FILE_HEADER.unpack_from(data, 0) != (FILE_MAGIC, FORMAT_VERSION):
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} leaderboard")
+        body = len(data) - header_size
+        whole = body - body % RECORD.size
+        if whole != body:
+            # Partial record from a crash mid-append
+            with open(self.path, 'r+b') as f:
+                f.truncate(header_size + whole)
+
+        # Built locally and swapped in, so lookups never see a half-loaded index
+        bests = {}
+        heap = []
+        for seq, (timestamp, score, raw) in enumerate(
+                RECORD.iter_unpack(memoryview(data)[header_size:header_size + whole])):
+            name = raw.rstrip(b'\0').decode('utf-8', 'replace')
+            best = bests.get(name)
+            if best is None or score > best[0]:
+                bests[name] = (score, seq, timestamp)
+            entry = (score, -seq, timestamp, name)
+            if len(heap) < self.capacity:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        self._seq = self.records = whole // RECORD.size
+        self._heap = heap
+        self._bests = bests
+        self._publish()
+
+        self._file = open(self.path, 'ab')
+        if self._should_compact():
+            self._compact()
+
+    def _append(self, records):
+        self._file.write(b''.join(records))
+        self._file.flush()
+        if self.durable:
+            os.fsync(self._file.fileno())
+        self.records += len(records)
+        self._publish()
+        if self._should_compact():
+            self._compact()
+
+    def _should_compact(self):
+        # Heap and bests overlap, so this overestimates the live records
+        live = len(self._heap) + len(self._bests)
+        return self.records >= self.min_compact_records and self.records > self.compact_ratio * live
+
+    def _compact(self):
+        """Rewrite the log with only the games top() or best() can still return."""
+        live = {}
+        for score, neg_seq, timestamp, name in self._heap:
+            live[-neg_seq] = (timestamp, score, name)
+        for name, (score, seq, timestamp) in self._bests.items():
+            live[seq] = (timestamp, score, name)
+
+        # Written beside the log and renamed over it, so a crash leaves one or the other
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION))
+            f.write(b''.join(RECORD.pack(timestamp, score, name.encode('utf-8'))
+                             for _, (timestamp, score, name) in sorted(live.items())))
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'ab')
+        self.records = len(live)
+        self.compactions += 1
@@ -0,0 +1,193 @@
+"""
+Lightweight runtime profiler for the game loop and the gesture threads.
+
+Stages are timed with perf_counter_ns into fixed-size ring buffers:
+
+    with profiler.stage('render'):
+        renderer.render(...)
+
+While the profiler is disabled a stage costs one dict lookup and two trivial
+method calls, so the instrumentation can stay in the loop permanently and be
+toggled at runtime. Each stage must only be entered from one thread at a time;
+different stages may live on different threads.
+"""
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted sequence (0 when empty)."""
+    if not ordered:
+        return 0
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StageTimes:
+    """Ring buffer of (start, duration) samples in nanoseconds for one named stage."""
+
+    def __init__(self, profiler, name, capacity):
+        self.profiler = profiler
+        self.name = name
+        self.capacity = capacity
+        self.starts = array('q', bytes(8 * capacity))
+        self.durations = array('q', bytes(8 * capacity))
+        self.count = 0  # total samples ever recorded; the ring holds the last `capacity`
+        self.thread_id = None
+        self._start = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        start = self._start
+        if start is not None:
+            self._start = None
+            self.add(start, time.perf_counter_ns() - start)
+        return False
+
+    def add(self, start, duration):
+        slot = self.count % self.capacity
+        self.starts[slot] = start
+        self.durations[slot] = duration
+        self.count += 1
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def samples(self):
+        """(start, duration) pairs currently in the ring, oldest first."""
+        n = len(self)
+        first = self.count - n
+        return [(self.starts[i % self.capacity], self.durations[i % self.capacity])
+                for i in range(first, self.count)]
+
+    def clear(self):
+        self.count = 0
+
+
+class Profiler:
+    """
+    Named stage timers plus a per-frame record of frame time and allocations.
+
+    Call frame() once per main-loop iteration: it records the time since the
+    previous call and the change in sys.getallocatedblocks(), i.e. how many more
+    (or fewer) memory blocks were live at the end of the frame than at its start.
+    """
+
+    FRAME = 'frame'
+
+    def __init__(self, capacity=1024, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.stages = {}
+        self.allocations = array('q', bytes(8 * capacity))  # block delta per frame
+        self._lock = threading.Lock()
+        self._frame_start = None
+        self._frame_blocks = None
+
+    def stage(self, name):
+        """Return the timer for name, creating it on first use."""
+        stage = self.stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self.stages.get(name)
+                if stage is None:
+                    stage = StageTimes(self, name, self.capacity)
+                    self.stages[name] = stage
+        return stage
+
+    def toggle(self):
+        """Flip profiling on or off and return the new state."""
+        self.enabled = not self.enabled
+        self._frame_start = None
+        return self.enabled
+
+    def frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        blocks = sys.getallocatedblocks()
+        if self._frame_start is not None:
+            frames = self.stage(self.FRAME)
+            self.allocations[frames.count % self.capacity] = blocks - self._frame_blocks
+            frames.add(self._frame_start, now - self._frame_start)
+        self._frame_start = now
+        self._frame_blocks = blocks
+
+    def clear(self):
+        for stage in list(self.stages.values()):
+            stage.clear()
+        self._frame_start = None
+
+    def summary(self):
+        """
+        {stage: (p50 ms, p99 ms, samples)} for every stage with samples, plus
+        'alloc_blocks': (p50, p99, max) of the per-frame allocated block delta.
+        """
+        result = {}
+        for name, stage in list(self.stages.items()):
+            n = len(stage)
+            if not n:
+                continue
+            ordered = sorted(stage.durations[:n])
+            result[name] = (percentile(ordered, 50) / 1e6, percentile(ordered, 99) / 1e6, stage.count)
+        frames = self.stages.get(self.FRAME)
+        if frames is not None and len(frames):
+            ordered = sorted(self.allocations[:len(frames)])
+            result['alloc_blocks'] = (percentile(ordered, 50), percentile(ordered, 99), ordered[-1])
+        return result
+
+    def _frame_allocations(self):
+        """{frame start ns: allocated block delta} for the frames still in the ring."""
+        frames = self.stages.get(self.FRAME)
+        if frames is None:
+            return {}
+        first = frames.count - len(frames)
+        return {frames.starts[i % self.capacity]: self.allocations[i % self.capacity]
+                for i in range(first, frames.count)}
+
+    def export_chrome_trace(self, path):
+        """Write the ring buffers as Chrome trace events (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for name, stage in list(self.stages.items()):
+            for start, duration in stage.samples():
+                events.append({'name': name, 'ph': 'X', 'ts': start / 1000.0, 'dur': duration / 1000.0,
+                               'pid': pid, 'tid': stage.thread_id or 0})
+        for start, blocks in self._frame_allocations().items():
+            events.append({'name': 'allocated blocks', 'ph': 'C', 'ts': start / 1000.0, 'pid': pid,
+                           'args': {'delta': blocks}})
+        events.sort(key=lambda event: event['ts'])
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+    def export_csv(self, path):
+        """Write one row per sample: stage, thread, start_ns, duration_ns, alloc_blocks."""
+        allocations = self._frame_allocations()
+        rows = 0
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['stage', 'thread', 'start_ns', 'duration_ns', 'alloc_blocks'])
+            for name, stage in list(self.stages.items()):
+                for start, duration in stage.samples():
+                    blocks = allocations.get(start, '') if name == self.FRAME else ''
+                    writer.writerow([name, stage.thread_id, start, duration, blocks])
+                    rows += 1
+        return rows
+
+    def export(self, path):
+        """Export as CSV if path ends in .csv, otherwise as Chrome trace JSON."""
+        if path.lower().endswith('.csv'):
+            return self.export_csv(path)
+        return self.export_chrome_trace(path)
@@ -1,7 +1,14 @@
+import itertools
+import time
 import pygame
+from game.text_cache import TextCache
+
+# One color per arena snake, cycled when there are more snakes
+ARENA_COLORS = [(0, 255, 0), (0, 200, 255), (255, 220, 0), (255, 100, 255),
+                (255, 140, 60), (160, 120, 255), (120, 255, 200), (255, 255, 255)]
 
 class Renderer:
-    def __init__(self, window_width, window_height, grid_size):
+    def __init__(self, window_width, window_height, grid_size, incremental=True):
         self.window_width = window_width
         self.window_height = window_height
         self.grid_size = grid_size
@@ -12,185 +19,429 @@ class Renderer:
         self.padding = 15
         self.game_area_x = self.padding
         self.game_area_y = self.padding + 50
-
-    def render(self, game_engine, show_menu=False, selected_menu_option=0, game_over_option=0):
-        self.screen.fill((10, 10, 15))
+        self.bar_height = 45
+        # Webcam thumbnail shown at the right end of the score bar during play
+        self.preview = None
+        self.preview_margin = 10
         
+        # Dirty-rectangle rendering: the static background is drawn once, then each
+        # game frame only repaints the cells that changed
+        self.incremental = incremental
+        self._background = None
+        self._last_frame = None
+        
+        # Fonts and rendered text are cached; static screens are built once
+        self.text_cache = TextCache()
+        self._screens = {}
+        self._overlay = None
+        self._profile_panel = None
+        self._profile_panel_time = 0.0
+
+    def invalidate(self):
+        """Force the next game frame to be drawn in full, e.g. after an overlay is removed."""
+        self._last_frame = None
+
+    def render(self, game_engine, show_menu=False, selected_menu_option=0, game_over_option=0, alpha=1.0,
+               leaderboard=None, player=None):
+        """
+        Draw one frame. alpha is the fraction of the current simulation tick that has
+        elapsed; the head is interpolated from its previous cell by that amount.
+        The game over screen lists leaderboard's top scores and player's best.
+        """
         if show_menu:
-            self._draw_menu(selected_menu_option)
+            self._last_frame = None
+            screen = self._get_screen(('menu', selected_menu_option),
+                                      lambda surface: self._draw_menu(selected_menu_option, surface))
+            self.screen.blit(screen, (0, 0))
+            pygame.display.flip()
+            return
+        
+        snake = game_engine.snake
+        if snake.prev_head is None or game_engine.game_over:
+            alpha = 1.0
+        
+        if self.incremental and not game_engine.game_over and self._can_draw_incrementally(game_engine):
+            self._render_incremental(game_engine, alpha)
+            return
+        
+        self.screen.blit(self._get_background(), (0, 0))
+        
+        # Draw snake
+        body_color = tuple(int(c * 0.7) for c in game_engine.snake_color)
+        for segment in itertools.islice(snake.body, 1, None):
+            pygame.draw.rect(self.screen, body_color, self._cell_rect(segment, 1))
+        head_rect = self._head_rect(snake, alpha)
+        self._draw_head(game_engine, head_rect)
+        
+        # Draw food with animation effect (no food once the board is full)
+        self._draw_food(game_engine)
+        
+        # Draw score and info at top
+        self._draw_score_bar(game_engine)
+        
+        # Draw game over message centered
+        if game_engine.game_over:
+            self._last_frame = None
+            self._draw_game_over_screen(game_over_option, leaderboard, player)
         else:
+            self._draw_preview()
+            self._remember_frame(game_engine, head_rect)
+        
+        pygame.display.flip()
+
+    def _get_background(self):
+        """Static background (fill, game area, border and grid), rendered once."""
+        if self._background is None:
+            background = pygame.Surface((self.window_width, self.window_height)).convert()
+            background.fill((10, 10, 15))
+            
             # Draw game area background with gradient effect
             game_area_width = self.window_width - 2 * self.padding
             game_area_height = self.window_height - self.game_area_y - self.padding
             game_area_rect = pygame.Rect(self.game_area_x, self.game_area_y, game_area_width, game_area_height)
-            pygame.draw.rect(self.screen, (15, 15, 20), game_area_rect)
-            pygame.draw.rect(self.screen, (80, 200, 100), game_area_rect, 3)
+            pygame.draw.rect(background, (15, 15, 20), game_area_rect)
+            pygame.draw.rect(background, (80, 200, 100), game_area_rect, 3)
             
             # Draw grid background
             for x in range(0, game_area_width, self.grid_size):
-                pygame.draw.line(self.screen, (30, 30, 40), 
+                pygame.draw.line(background, (30, 30, 40),
                     (self.game_area_x + x, self.game_area_y),
                     (self.game_area_x + x, self.game_area_y + game_area_height), 1)
             for y in range(0, game_area_height, self.grid_size):
-                pygame.draw.line(self.screen, (30, 30, 40),
+                pygame.draw.line(background, (30, 30, 40),
                     (self.game_area_x, self.game_area_y + y),
                     (self.game_area_x + game_area_width, self.game_area_y + y), 1)
-            
-            # Draw snake
-            for i, segment in enumerate(game_engine.snake.body):
-                rect = pygame.Rect(
-                    self.game_area_x + segment[0] * self.grid_size + 1,
-                    self.game_area_y + segment[1] * self.grid_size + 1,
-                    self.grid_size - 2,
-                    self.grid_size - 2
-                )
-                # Head is brighter
-                if i == 0:
-                    pygame.draw.rect(self.screen, game_engine.snake_color, rect)
-                    pygame.draw.rect(self.screen, (100, 255, 100), rect, 2)
-                else:
-                    color = tuple(int(c * 0.7) for c in game_engine.snake_color)
-                    pygame.draw.rect(self.screen, color, rect)
-            
-            # Draw food with animation effect
-            food_rect = pygame.Rect(
-                self.game_area_x + game_engine.food.position[0] * self.grid_size + 2,
-                self.game_area_y + game_engine.food.position[1] * self.grid_size + 2,
-                self.grid_size - 4,
-                self.grid_size - 4
+            self._background = background
+        return self._background
+
+    def _cell_rect(self, cell, inset):
+        return pygame.Rect(
+            self.game_area_x + int(cell[0] * self.grid_size) + inset,
+            self.game_area_y + int(cell[1] * self.grid_size) + inset,
+            self.grid_size - 2 * inset,
+            self.grid_size - 2 * inset
+        )
+
+    def _head_rect(self, snake, alpha):
+        head = snake.body[0]
+        if alpha < 1.0:
+            head = (
+                snake.prev_head[0] + (head[0] - snake.prev_head[0]) * alpha,
+                snake.prev_head[1] + (head[1] - snake.prev_head[1]) * alpha,
             )
-            pygame.draw.rect(self.screen, game_engine.food_color, food_rect)
-            pygame.draw.rect(self.screen, (255, 150, 0), food_rect, 2)
-            
-            # Draw score and info at top
-            self._draw_score_bar(game_engine)
-            
-            # Draw game over message centered
-            if game_engine.game_over:
-                self._draw_game_over_screen(game_over_option)
+        return self._cell_rect(head, 1)
+
+    def _draw_head(self, game_engine, rect):
+        # Head is brighter
+        pygame.draw.rect(self.screen, game_engine.snake_color, rect)
+        pygame.draw.rect(self.screen, (100, 255, 100), rect, 2)
+
+    def _draw_food(self, game_engine):
+        if game_engine.food.position is None:
+            return None
+        food_rect = self._cell_rect(game_engine.food.position, 2)
+        pygame.draw.rect(self.screen, game_engine.food_color, food_rect)
+        pygame.draw.rect(self.screen, (255, 150, 0), food_rect, 2)
+        return food_rect
+
+    def _remember_frame(self, game_engine, head_rect):
+        """Record what the last game frame drew so the next one can diff against it."""
+        snake = game_engine.snake
+        self._last_frame = {
+            'snake': snake,
+            'head': snake.body[0],
+            'prev_head': snake.prev_head,
+            'tail': snake.body[-1],
+            'length': len(snake.body),
+            'head_rect': head_rect,
+            'food': game_engine.food.position,
+            'colors': (game_engine.snake_color, game_engine.food_color),
+        }
+
+    def _can_draw_incrementally(self, game_engine):
+        """True if at most one tick happened since the last game frame was drawn."""
+        last = self._last_frame
+        if last is None:
+            return False
+        snake = game_engine.snake
+        if snake is not last['snake'] or (game_engine.snake_color, game_engine.food_color) != last['colors']:
+            return False
+        if snake.body[0] == last['head'] and snake.prev_head == last['prev_head']:
+            return len(snake.body) == last['length']
+        # Exactly one move: the previous head is now one step behind
+        return snake.prev_head == last['head'] and len(snake.body) - last['length'] in (0, 1)
+
+    def _render_incremental(self, game_engine, alpha):
+        """Redraw only the cells that changed since the last frame and push those rects."""
+        last = self._last_frame
+        snake = game_engine.snake
+        background = self._get_background()
+        dirty = []
         
-        pygame.display.flip()
+        def restore(rect):
+            self.screen.blit(background, rect, rect)
+            dirty.append(rect)
+        
+        restore(last['head_rect'])
+        if snake.body[-1] != last['tail'] and len(snake.body) == last['length']:
+            restore(self._cell_rect(last['tail'], 0))
+        if last['food'] is not None and last['food'] != game_engine.food.position:
+            restore(self._cell_rect(last['food'], 0))
+        
+        # Segments under the old head rect lost pixels when it was restored
+        body_color = tuple(int(c * 0.7) for c in game_engine.snake_color)
+        for segment in itertools.islice(snake.body, 1, 3):
+            rect = self._cell_rect(segment, 1)
+            pygame.draw.rect(self.screen, body_color, rect)
+            dirty.append(rect)
+        
+        head_rect = self._head_rect(snake, alpha)
+        self._draw_head(game_engine, head_rect)
+        dirty.append(head_rect)
+        
+        food_rect = self._draw_food(game_engine)
+        if food_rect is not None:
+            dirty.append(food_rect)
+        
+        # Leave the webcam thumbnail alone; draw_preview() pushes it when it changes
+        bar_width = self._preview_rect().left if self.preview is not None else None
+        dirty.append(self._draw_score_bar(game_engine, bar_width))
+        self._remember_frame(game_engine, head_rect)
+        pygame.display.update(dirty)
 
-    def _draw_score_bar(self, game_engine):
-        """Draw score and game info bar."""
-        bar_height = 45
-        bar_rect = pygame.Rect(0, 0, self.window_width, bar_height)
+    def _draw_score_bar(self, game_engine, bar_width=None):
+        """Draw score and game info bar. bar_width: repaint only that much of it."""
+        bar_height = self.bar_height
+        bar_width = self.window_width if bar_width is None else bar_width
+        bar_rect = pygame.Rect(0, 0, bar_width, bar_height)
         pygame.draw.rect(self.screen, (20, 20, 30), bar_rect)
-        pygame.draw.line(self.screen, (80, 200, 100), (0, bar_height), (self.window_width, bar_height), 2)
+        pygame.draw.line(self.screen, (80, 200, 100), (0, bar_height), (bar_width, bar_height), 2)
         
         # Score
-        score_font = pygame.font.Font(None, 32)
-        score_text = score_font.render(f"SCORE: {game_engine.score}", True, (80, 200, 100))
+        score_text = self.text_cache.render(f"SCORE: {game_engine.score}", 32, (80, 200, 100))
         self.screen.blit(score_text, (self.padding + 10, 7))
         
         # Snake length
-        length_font = pygame.font.Font(None, 28)
-        length_text = length_font.render(f"Length: {len(game_engine.snake.body)}", True, (200, 200, 100))
+        length_text = self.text_cache.render(f"Length: {len(game_engine.snake.body)}", 28, (200, 200, 100))
         self.screen.blit(length_text, (self.window_width - 200, 10))
+        return pygame.Rect(0, 0, bar_width, bar_height + 2)
+
+    def render_arena(self, arena, labels, game_over_option=0):
+        """
+        Draw one arena frame in full: every living snake in its own color, all food,
+        and each player's score labelled with labels[i]. Dead snakes are not drawn.
+        """
+        self._last_frame = None
+        self.screen.blit(self._get_background(), (0, 0))
+        for i, snake in enumerate(arena.snakes):
+            if not arena.alive[i]:
+                continue
+            color = ARENA_COLORS[i % len(ARENA_COLORS)]
+            body_color = tuple(int(c * 0.7) for c in color)
+            for segment in itertools.islice(snake.body, 1, None):
+                pygame.draw.rect(self.screen, body_color, self._cell_rect(segment, 1))
+            head_rect = self._cell_rect(snake.body[0], 1)
+            pygame.draw.rect(self.screen, color, head_rect)
+            pygame.draw.rect(self.screen, (255, 255, 255), head_rect, 2)
+        for cell in arena.food:
+            food_rect = self._cell_rect(cell, 2)
+            pygame.draw.rect(self.screen, (255, 0, 0), food_rect)
+            pygame.draw.rect(self.screen, (255, 150, 0), food_rect, 2)
+        self._draw_arena_score_bar(arena, labels)
+        if arena.game_over:
+            self._draw_game_over_screen(game_over_option)
+        else:
+            self._draw_preview()
+        pygame.display.flip()
+
+    def _draw_arena_score_bar(self, arena, labels):
+        """Each player's label and score in its snake's color, greyed out once dead."""
+        bar_height = self.bar_height
+        pygame.draw.rect(self.screen, (20, 20, 30), pygame.Rect(0, 0, self.window_width, bar_height))
+        pygame.draw.line(self.screen, (80, 200, 100), (0, bar_height), (self.window_width, bar_height), 2)
+        x = self.padding + 10
+        for i, (label, score) in enumerate(zip(labels, arena.scores)):
+            color = ARENA_COLORS[i % len(ARENA_COLORS)] if arena.alive[i] else (90, 90, 90)
+            text = self.text_cache.render(f"{label} {score}", 26, color)
+            self.screen.blit(text, text.get_rect(midleft=(x, bar_height // 2)))
+            x += text.get_width() + 20
+
+    def _get_screen(self, key, draw):
+        """Return a full-window surface built once by draw(surface) and cached by key."""
+        surface = self._screens.get(key)
+        if surface is None:
+            surface = pygame.Surface((self.window_width, self.window_height)).convert()
+            surface.fill((10, 10, 15))
+            draw(surface)
+            self._screens[key] = surface
+        return surface
 
-    def _draw_menu(self, selected_option):
+    def _blit_centered(self, surface, text, size, color, center):
+        text_surface = self.text_cache.render(text, size, color)
+        text_rect = text_surface.get_rect(center=center)
+        surface.blit(text_surface, text_rect)
+        return text_rect
+
+    def _draw_menu(self, selected_option, surface=None):
         """Draw main menu screen."""
+        surface = surface or self.screen
         # Title
-        title_font = pygame.font.Font(None, 80)
-        title_text = title_font.render("SNAKE", True, (80, 200, 100))
-        title_rect = title_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 180))
-        self.screen.blit(title_text, title_rect)
-        
-        subtitle_font = pygame.font.Font(None, 36)
-        subtitle_text = subtitle_font.render("GESTURE CONTROL", True, (200, 200, 100))
-        subtitle_rect = subtitle_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 110))
-        self.screen.blit(subtitle_text, subtitle_rect)
+        self._blit_centered(surface, "SNAKE", 80, (80, 200, 100),
+                            (self.window_width // 2, self.window_height // 2 - 180))
+        self._blit_centered(surface, "GESTURE CONTROL", 36, (200, 200, 100),
+                            (self.window_width // 2, self.window_height // 2 - 110))
         
         # Menu options
         options = ["Start Game", "Skins"]
-        menu_font = pygame.font.Font(None, 50)
         
         for i, option in enumerate(options):
             color = (255, 255, 0) if i == selected_option else (200, 200, 200)
-            option_text = menu_font.render(option, True, color)
-            option_rect = option_text.get_rect(center=(self.window_width // 2, self.window_height // 2 + 30 + i * 80))
+            option_rect = self._blit_centered(surface, option, 50, color,
+                                              (self.window_width // 2, self.window_height // 2 + 30 + i * 80))
             
             # Highlight box for selected option
             if i == selected_option:
                 box_rect = option_rect.inflate(40, 20)
-                pygame.draw.rect(self.screen, (80, 200, 100), box_rect, 3)
-            
-            self.screen.blit(option_text, option_rect)
+                pygame.draw.rect(surface, (80, 200, 100), box_rect, 3)
         
         # Instructions
-        inst_font = pygame.font.Font(None, 24)
-        inst_text = inst_font.render("Use UP/DOWN to navigate, ENTER to select", True, (150, 150, 150))
-        inst_rect = inst_text.get_rect(center=(self.window_width // 2, self.window_height - 50))
-        self.screen.blit(inst_text, inst_rect)
+        self._blit_centered(surface, "Use UP/DOWN to navigate, ENTER to select", 24, (150, 150, 150),
+                            (self.window_width // 2, self.window_height - 50))
 
-    def _draw_skins_menu(self, selected_skin):
+    def _draw_skins_menu(self, selected_skin, surface=None):
         """Draw skins selection screen."""
+        surface = surface or self.screen
         # Title
-        title_font = pygame.font.Font(None, 60)
-        title_text = title_font.render("SELECT SKIN", True, (80, 200, 100))
-        title_rect = title_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 150))
-        self.screen.blit(title_text, title_rect)
+        self._blit_centered(surface, "SELECT SKIN", 60, (80, 200, 100),
+                            (self.window_width // 2, self.window_height // 2 - 150))
         
         # Skin options with color preview
         skins = ["Classic", "Neon", "Retro"]
         skin_colors = [(0, 255, 0), (0, 255, 255), (255, 255, 0)]
-        skin_font = pygame.font.Font(None, 48)
         
         for i, (skin, color) in enumerate(zip(skins, skin_colors)):
             text_color = (255, 255, 0) if i == selected_skin else (200, 200, 200)
-            skin_text = skin_font.render(skin, True, text_color)
-            skin_rect = skin_text.get_rect(center=(self.window_width // 2 + 100, self.window_height // 2 + i * 70))
+            skin_rect = self._blit_centered(surface, skin, 48, text_color,
+                                            (self.window_width // 2 + 100, self.window_height // 2 + i * 70))
             
             # Color preview box
             preview_rect = pygame.Rect(self.window_width // 2 - 150, self.window_height // 2 - 10 + i * 70, 80, 50)
-            pygame.draw.rect(self.screen, color, preview_rect)
-            pygame.draw.rect(self.screen, (200, 200, 200), preview_rect, 2)
+            pygame.draw.rect(surface, color, preview_rect)
+            pygame.draw.rect(surface, (200, 200, 200), preview_rect, 2)
             
             # Highlight box for selected skin
             if i == selected_skin:
                 box_rect = skin_rect.inflate(40, 20)
-                pygame.draw.rect(self.screen, (80, 200, 100), box_rect, 3)
-            
-            self.screen.blit(skin_text, skin_rect)
+                pygame.draw.rect(surface, (80, 200, 100), box_rect, 3)
         
         # Back instruction
-        back_font = pygame.font.Font(None, 32)
-        back_text = back_font.render("Press ESC to go back", True, (150, 150, 150))
-        back_rect = back_text.get_rect(center=(self.window_width // 2, self.window_height - 50))
-        self.screen.blit(back_text, back_rect)
+        self._blit_centered(surface, "Press ESC to go back", 32, (150, 150, 150),
+                            (self.window_width // 2, self.window_height - 50))
 
     def render_skins_menu(self, selected_skin):
         """Render skins menu."""
-        self.screen.fill((10, 10, 15))
-        self._draw_skins_menu(selected_skin)
+        self._last_frame = None
+        screen = self._get_screen(('skins', selected_skin),
+                                  lambda surface: self._draw_skins_menu(selected_skin, surface))
+        self.screen.blit(screen, (0, 0))
         pygame.display.flip()
 
-    def _draw_game_over_screen(self, selected_option=0):
+    def _draw_game_over_screen(self, selected_option=0, leaderboard=None, player=None):
         """Draw centered game over screen with menu options."""
-        # Semi-transparent overlay
-        overlay = pygame.Surface((self.window_width, self.window_height))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        # Semi-transparent overlay, built once per resolution
+        if self._overlay is None:
+            self._overlay = pygame.Surface((self.window_width, self.window_height))
+            self._overlay.set_alpha(180)
+            self._overlay.fill((0, 0, 0))
+        self.screen.blit(self._overlay, (0, 0))
         
         # Game over title
-        game_over_font = pygame.font.Font(None, 80)
-        game_over_text = game_over_font.render("GAME OVER", True, (255, 100, 100))
-        game_over_rect = game_over_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 140))
-        self.screen.blit(game_over_text, game_over_rect)
+        self._blit_centered(self.screen, "GAME OVER", 80, (255, 100, 100),
+                            (self.window_width // 2, self.window_height // 2 - 140))
         
         # Game over options
         options = ["Restart", "Main Menu"]
-        option_font = pygame.font.Font(None, 44)
         
         for i, option in enumerate(options):
             color = (255, 255, 0) if i == selected_option else (200, 200, 200)
-            option_text = option_font.render(option, True, color)
-            option_rect = option_text.get_rect(center=(self.window_width // 2, self.window_height // 2 - 20 + i * 80))
+            option_rect = self._blit_centered(self.screen, option, 44, color,
+                                              (self.window_width // 2, self.window_height // 2 - 20 + i * 80))
             
             # Highlight box for selected option
             if i == selected_option:
                 box_rect = option_rect.inflate(40, 20)
                 pygame.draw.rect(self.screen, (80, 200, 100), box_rect, 3)
-            
-            self.screen.blit(option_text, option_rect)
+        
+        if leaderboard is not None:
+            self._draw_high_scores(leaderboard, player)
+
+    def _draw_high_scores(self, leaderboard, player, rows=5):
+        """High score table under the game over options; reads only published results."""
+        center_x = self.window_width // 2
+        y = self.window_height // 2 + 115
+        self._blit_centered(self.screen, "HIGH SCORES", 30, (80, 200, 100), (center_x, y))
+        for i, (name, score) in enumerate(leaderboard.top(rows)):
+            y += 26
+            color = (255, 255, 0) if name == player else (200, 200, 200)
+            name_text = self.text_cache.render(f"{i + 1}. {name}", 26, color)
+            self.screen.blit(name_text, name_text.get_rect(midleft=(center_x - 120, y)))
+            score_text = self.text_cache.render(str(score), 26, color)
+            self.screen.blit(score_text, score_text.get_rect(midright=(center_x + 120, y)))
+        best = leaderboard.best(player) if player is not None else None
+        if best is not None:
+            self._blit_centered(self.screen, f"YOUR BEST: {best}", 26, (200, 200, 100),
+                                (center_x, self.window_height - 15))
+
+    def draw_profile_overlay(self, profiler, refresh=0.5):
+        """
+        Draw the profiler's p50/p99 stage times over the current frame and push that
+        rect. The panel is only re-rendered every `refresh` seconds.
+        """
+        now = time.perf_counter()
+        if self._profile_panel is None or now - self._profile_panel_time >= refresh:
+            self._profile_panel = self._build_profile_panel(profiler.summary())
+            self._profile_panel_time = now
+        rect = self._profile_panel.get_rect(topright=(self.window_width - 5, 50))
+        self.screen.blit(self._profile_panel, rect)
+        pygame.display.update(rect)
+
+    def draw_preview(self, surface):
+        """
+        Draw a new webcam thumbnail frame at the right end of the score bar and push
+        that rect. Full game frames redraw the last one; menus and the game over
+        screen leave it out. It must fit in the bar, so no playable cell is ever
+        hidden under it.
+        """
+        self.preview = surface
+        pygame.display.update(self._draw_preview())
+
+    def _preview_rect(self):
+        return self.preview.get_rect(topright=(self.window_width - self.preview_margin, 0))
+
+    def _draw_preview(self):
+        if self.preview is None:
+            return None
+        rect = self._preview_rect()
+        self.screen.blit(self.preview, rect)
+        return rect
+
+    def _build_profile_panel(self, summary):
+        """Render the profiler summary as a small translucent table."""
+        font = self.text_cache.font(20)
+        alloc = summary.pop('alloc_blocks', None)
+        rows = [("stage", "p50 ms", "p99 ms")]
+        rows += [(name, f"{p50:.2f}", f"{p99:.2f}") for name, (p50, p99, _) in summary.items()]
+        if alloc is not None:
+            rows.append(("alloc blk/frame", f"{alloc[0]:+d}", f"{alloc[1]:+d}"))
+        line_height = font.get_linesize()
+        panel = pygame.Surface((250, 8 + line_height * len(rows)))
+        panel.set_alpha(210)
+        panel.fill((20, 20, 30))
+        for i, row in enumerate(rows):
+            color = (80, 200, 100) if i == 0 else (220, 220, 220)
+            y = 4 + i * line_height
+            panel.blit(font.render(row[0], True, color), (6, y))
+            for text, right in zip(row[1:], (185, 244)):
+                surface = font.render(text, True, color)
+                panel.blit(surface, surface.get_rect(topright=(right, y)))
+        return panel
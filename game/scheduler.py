@@ -0,0 +1,68 @@
+import time
+
+
+class FixedTimestep:
+    """
+    Accumulator that turns wall-clock time into fixed-size simulation ticks.
+
+    The game loop calls advance() (once per rendered frame, or whenever
+    time_to_next_tick() has elapsed) and runs the returned number of ticks, so snake
+    speed depends only on tick_rate while rendering and input polling run as fast as
+    the display allows. alpha is the fraction of a tick left over, used by the
+    renderer to interpolate between ticks.
+    """
+
+    def __init__(self, tick_rate, max_ticks_per_frame=5, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last_time = None
+
+    @property
+    def tick_rate(self):
+        return self._tick_rate
+
+    @tick_rate.setter
+    def tick_rate(self, value):
+        self._tick_rate = value
+        self.tick_duration = 1.0 / value
+
+    @property
+    def alpha(self):
+        pending = self.accumulator
+        if self.last_time is not None:
+            # Time since the last advance() counts too, so alpha keeps moving when
+            # ticks are driven by a separate task rather than once per frame
+            pending += self.clock() - self.last_time
+        return min(1.0, pending / self.tick_duration)
+
+    def time_to_next_tick(self):
+        """Seconds until advance() will next return at least one tick."""
+        if self.last_time is None:
+            return 0.0
+        pending = self.accumulator + self.clock() - self.last_time
+        return max(0.0, self.tick_duration - pending)
+
+    def reset(self):
+        """Drop accumulated time, e.g. while paused or in a menu."""
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def advance(self):
+        """Return how many simulation ticks are due since the previous call."""
+        now = self.clock()
+        if self.last_time is None:
+            self.last_time = now
+            return 0
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        ticks = int(self.accumulator / self.tick_duration)
+        if ticks > self.max_ticks_per_frame:
+            # Too far behind (window dragged, debugger, ...): skip instead of spiralling
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick_duration
+        return ticks
@@ -1,5 +1,7 @@
 import random
+from collections import deque
 from enum import Enum
+from game.free_cells import FreeCellIndex
 
 class Direction(Enum):
     UP = (0, -1)
@@ -7,20 +9,79 @@ class Direction(Enum):
     LEFT = (-1, 0)
     RIGHT = (1, 0)
 
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
 class Snake:
     def __init__(self, grid_width, grid_height):
         self.grid_width = grid_width
         self.grid_height = grid_height
-        self.body = [(grid_width // 2, grid_height // 2)]
+        start = (grid_width // 2, grid_height // 2)
+        # Head at body[0]; the occupancy set mirrors body for O(1) collision checks
+        self.body = deque([start])
+        self.occupied = {start}
         self.direction = Direction.RIGHT
         self.next_direction = Direction.RIGHT
+        self.prev_head = None
+        self.last_tail = None  # Cell vacated by the most recent move, if any
+        # Turns requested between ticks, applied one per tick so quick turns aren't lost
+        self.direction_queue = deque()
+        self.max_queued_turns = 3
+
+    def set_body(self, cells):
+        """Replace the body with cells, head first."""
+        self.body = deque(cells)
+        self.occupied = set(self.body)
+
+    def queue_direction(self, direction):
+        """Buffer a turn. Ignores repeats and reversals of the last queued direction."""
+        if len(self.direction_queue) >= self.max_queued_turns:
+            return False
+        last = self.direction_queue[-1] if self.direction_queue else self.direction
+        if direction == last or direction == OPPOSITE[last]:
+            return False
+        self.direction_queue.append(direction)
+        return True
+
+    def apply_queued_direction(self):
+        """Pop the next buffered turn into next_direction. Called once per tick."""
+        if self.direction_queue:
+            self.next_direction = self.direction_queue.popleft()
+
+    @property
+    def head(self):
+        return self.body[0]
 
-    def move(self):
+    def occupies(self, cell):
+        return cell in self.occupied
+
+    def move(self, grow=True):
+        """
+        Push a new head in the current direction. With grow=False the tail is
+        freed first, so the head may follow it into the vacated cell.
+        Returns True if the new head landed on the snake's own body.
+        """
         self.direction = self.next_direction
         dx, dy = self.direction.value
         head_x, head_y = self.body[0]
         new_head = (head_x + dx, head_y + dy)
-        self.body.insert(0, new_head)
+        self.prev_head = self.body[0]
+        self.last_tail = None if grow else self.remove_tail()
+        self.body.appendleft(new_head)
+        if new_head in self.occupied:
+            return True
+        self.occupied.add(new_head)
+        return False
+
+    def remove_tail(self):
+        """Pop and return the tail cell."""
+        tail = self.body.pop()
+        self.occupied.discard(tail)
+        return tail
 
     def grow(self):
         pass  # Body already extended by move()
@@ -30,18 +91,23 @@ class Snake:
         # Check wall collision
         if head[0] < 1 or head[0] >= self.grid_width or head[1] < 1 or head[1] >= self.grid_height:
             return True
-        # Check self collision
-        if head in self.body[1:]:
+        # A self collision leaves the head cell in body twice but in occupied once
+        if len(self.occupied) < len(self.body):
             return True
         return False
 
 class Food:
-    def __init__(self, grid_width, grid_height):
+    def __init__(self, grid_width, grid_height, free_cells=None, rng=None):
+        """
+        free_cells: FreeCellIndex kept in sync with the snake; food only spawns there.
+        rng: random.Random-like source, injectable for deterministic runs.
+        """
         self.grid_width = grid_width
         self.grid_height = grid_height
+        self.free_cells = free_cells if free_cells is not None else FreeCellIndex(grid_width, grid_height)
+        self.rng = rng if rng is not None else random.Random()
         self.position = self.spawn()
 
     def spawn(self):
-        x = random.randint(1, max(1, self.grid_width - 4))
-        y = random.randint(1, max(1, self.grid_height - 5))
-        return (x, y)
+        """Pick a free cell in O(1). Returns None when the board is full."""
+        return self.free_cells.choice(self.rng)
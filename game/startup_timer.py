@@ -0,0 +1,38 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Records how long each startup phase takes, from any thread."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.origin = clock()
+        self.phases = []  # (name, start offset, duration, thread name)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            end = self.clock()
+            with self._lock:
+                self.phases.append((name, start - self.origin, end - start, threading.current_thread().name))
+
+    def mark(self, name):
+        """Record an instantaneous milestone, e.g. the first frame on screen."""
+        now = self.clock()
+        with self._lock:
+            self.phases.append((name, now - self.origin, 0.0, threading.current_thread().name))
+
+    def report(self):
+        """Return the recorded phases as a printable table, in start order."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        lines = [f"{'phase':<24} {'start ms':>9} {'took ms':>9}  thread"]
+        for name, start, duration, thread in phases:
+            lines.append(f"{name:<24} {start * 1000:>9.1f} {duration * 1000:>9.1f}  {thread}")
+        return "\n".join(lines)
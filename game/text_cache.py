@@ -0,0 +1,71 @@
+from collections import OrderedDict
+import pygame
+
+
+class TextCache:
+    """
+    Font registry keyed by size plus an LRU cache of rendered text surfaces.
+
+    Surfaces are keyed by (text, size, color). The cache is bounded both by entry
+    count and by an approximate pixel-memory budget; the least recently used
+    surfaces are evicted first.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=8 * 1024 * 1024, antialias=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.antialias = antialias
+        self._fonts = {}
+        self._surfaces = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size):
+        """Return the default font at size, loading it only once."""
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self._fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """Return a rendered surface for text, reusing a cached one when possible."""
+        key = (text, size, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, self.antialias, color)
+        self._surfaces[key] = surface
+        self.bytes_used += self._surface_bytes(surface)
+        self._evict()
+        return surface
+
+    @staticmethod
+    def _surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def _evict(self):
+        while self._surfaces and (len(self._surfaces) > self.max_entries or self.bytes_used > self.max_bytes):
+            _, surface = self._surfaces.popitem(last=False)
+            self.bytes_used -= self._surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._surfaces),
+            'bytes': self.bytes_used,
+            'fonts': len(self._fonts),
+        }
@@ -0,0 +1,113 @@
+"""
+Adaptive quality control for the gesture pipeline.
+
+Fixed settings either lag on weak laptops or waste CPU on fast machines. The
+AdaptiveController watches how long each frame takes in GestureDetector.detect()
+and moves along a ladder of LEVELS, from the most accurate to the cheapest, to
+keep the average per-frame time within a latency budget. Each level sets:
+
+    camera mode      width, height and fps, via CAP_PROP_* on the capture thread
+    inference stride run the model on every Nth frame, track the hand in between
+    model complexity MediaPipe Hands model 1 or 0
+
+Over budget, it steps down at once. It steps back up only after `patience`
+windows in a row well under budget, and an up step that immediately overshoots
+doubles that patience, so a machine on the edge does not flip between two levels.
+Every change is logged through the ml.adaptive logger.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ((width, height, fps), inference stride, model complexity), most accurate first
+LEVELS = (
+    ((1280, 720, 30), 1, 1),
+    ((640, 480, 30), 1, 1),
+    ((640, 480, 30), 1, 0),
+    ((640, 480, 30), 2, 0),
+    ((320, 240, 30), 2, 0),
+    ((320, 240, 30), 3, 0),
+    ((320, 240, 15), 4, 0),
+)
+
+
+class AdaptiveController:
+    """
+    Tunes a CapturePipeline to a latency budget. Attach it with
+    pipeline.controller = controller; observe() then runs on the inference thread.
+    """
+
+    def __init__(self, pipeline, budget_ms=30.0, levels=LEVELS, start_level=1, window=30,
+                 headroom=0.5, patience=3, max_patience=48, settle_frames=5):
+        """
+        budget_ms: target average detect() time per frame.
+        window: frames averaged per decision.
+        headroom: step up only while under budget_ms * headroom.
+        settle_frames: frames ignored after a change (model rebuild, camera switch).
+        """
+        self.pipeline = pipeline
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.window = window
+        self.headroom = headroom
+        self.patience = patience
+        self.max_patience = max_patience
+        self.settle_frames = settle_frames
+        self.level = None
+        self.changes = 0
+        self._samples = []
+        self._calm_windows = 0
+        self._stepped_up = False
+        self._settling = 0
+        self._start_level = start_level
+
+    def start(self):
+        """Apply the starting level. Call before the pipeline starts."""
+        self._set_level(self._start_level, "starting level")
+
+    def observe(self, seconds):
+        """Record one detect() time and step the level when a window is complete."""
+        if self._settling:
+            self._settling -= 1
+            return
+        self._samples.append(seconds)
+        if len(self._samples) < self.window:
+            return
+        mean_ms = 1000 * sum(self._samples) / len(self._samples)
+        self._samples.clear()
+
+        if mean_ms > self.budget_ms:
+            self._calm_windows = 0
+            if self._stepped_up:
+                # The level above was already too slow: wait longer before retrying it
+                self.patience = min(self.patience * 2, self.max_patience)
+            if self.level + 1 < len(self.levels):
+                self._set_level(self.level + 1,
+                                f"{mean_ms:.1f} ms/frame is over the {self.budget_ms:.0f} ms budget")
+            self._stepped_up = False
+        elif mean_ms < self.budget_ms * self.headroom and self.level > 0:
+            self._calm_windows += 1
+            self._stepped_up = False
+            if self._calm_windows >= self.patience:
+                self._calm_windows = 0
+                self._set_level(self.level - 1,
+                                f"{mean_ms:.1f} ms/frame for {self.patience} windows, "
+                                f"budget {self.budget_ms:.0f} ms")
+                self._stepped_up = True
+        else:
+            self._calm_windows = 0
+            self._stepped_up = False
+
+    def _set_level(self, level, reason):
+        (width, height, fps), stride, complexity = self.levels[level]
+        logger.info("gesture quality level %s -> %d (%s): camera %dx%d at %d fps, "
+                    "model every %d frame(s), model complexity %d",
+                    self.level, level, reason, width, height, fps, stride, complexity)
+        self.level = level
+        self.changes += 1
+        detector = self.pipeline.gesture_detector
+        detector.inference_stride = stride
+        detector.set_model_complexity(complexity)
+        self.pipeline.request_camera(width, height, fps)
+        self._samples.clear()
+        self._settling = self.settle_frames
@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from game.profiler import Profiler
+
+logger = logging.getLogger(__name__)
+
+
+class LatestSlot:
+    """
+    Single-slot mailbox that only ever holds the most recent value.
+    Writers overwrite whatever is there, readers take it and leave the slot empty.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._full = False
+
+    def put(self, value):
+        """Store value. Returns True if an unread value was overwritten."""
+        with self._lock:
+            dropped = self._full
+            self._value = value
+            self._full = True
+        return dropped
+
+    def take(self):
+        """Return the latest value (or None) and empty the slot."""
+        with self._lock:
+            value = self._value
+            self._value = None
+            self._full = False
+        return value
+
+
+class PreviewBuffers:
+    """
+    Triple buffer of preview frames, each with the landmark state to draw on it.
+
+    The detector reuses its frame buffers, so the inference thread copies every
+    preview frame into a buffer it owns here. It always writes to the buffer that
+    is neither waiting to be read nor held by the reader, so a frame returned by
+    take() stays intact until the next take().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames = [None, None, None]
+        self._landmarks = [None, None, None]
+        self._pending = None  # Written and not yet taken
+        self._held = None  # Returned by the last take()
+
+    def publish(self, frame, landmarks):
+        """Copy frame in and make it the latest. Returns True if an unread frame was dropped."""
+        with self._lock:
+            index = next(i for i in range(3) if i != self._pending and i != self._held)
+        buffer = self._frames[index]
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = self._frames[index] = np.empty_like(frame)
+        np.copyto(buffer, frame)
+        self._landmarks[index] = landmarks
+        with self._lock:
+            dropped = self._pending is not None
+            self._pending = index
+        return dropped
+
+    def take(self):
+        """Return (frame, landmarks) published since the last take(), or None."""
+        with self._lock:
+            index = self._pending
+            if index is None:
+                return None
+            self._pending = None
+            self._held = index
+        return self._frames[index], self._landmarks[index]
+
+
+class PipelineMetrics:
+    """Counters and latency samples for the capture/inference pipeline."""
+
+    def __init__(self, window=240):
+        self.frames_captured = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.directions_published = 0
+        self.directions_dropped = 0
+        self.inference_times = deque(maxlen=window)  # seconds per detect() call
+        self.latencies = deque(maxlen=window)  # capture -> direction consumed, seconds
+
+    def record_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    @staticmethod
+    def _percentile(samples, pct):
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """Return a dict snapshot of the current metrics (times in milliseconds)."""
+        latencies = list(self.latencies)
+        inference = list(self.inference_times)
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_processed': self.frames_processed,
+            'frames_dropped': self.frames_dropped,
+            'directions_published': self.directions_published,
+            'directions_dropped': self.directions_dropped,
+            'inference_ms_mean': 1000 * sum(inference) / len(inference) if inference else 0.0,
+            'latency_ms_p50': 1000 * self._percentile(latencies, 50),
+            'latency_ms_p95': 1000 * self._percentile(latencies, 95),
+        }
+
+
+class CapturePipeline:
+    """
+    Runs webcam capture and gesture inference on background threads.
+
+    The capture thread keeps reading frames into a single-slot mailbox, so a slow
+    detector never builds up a backlog: it always works on the newest frame and
+    older unprocessed frames are counted as dropped. Detected directions are
+    published through another single-slot mailbox for the game loop to poll.
+    """
+
+    def __init__(self, cap, gesture_detector, profiler=None, preview=True):
+        """preview: publish processed frames for poll_frame(); off for headless use."""
+        self.cap = cap
+        self.gesture_detector = gesture_detector
+        self.preview = preview
+        # Optional ml.adaptive.AdaptiveController fed every detect() time
+        self.controller = None
+        self.metrics = PipelineMetrics()
+        # 'cap.read' and 'detect' stages are timed on their own threads
+        self.profiler = profiler or Profiler()
+
+        self._frames = LatestSlot()  # (capture_time, frame) waiting for inference
+        self._directions = LatestSlot()  # (capture_time, Direction) for the game loop
+        self._previews = PreviewBuffers()  # processed frames for display
+        # (results, crop, frame_size) the last polled frame was processed with
+        self.preview_landmarks = None
+        self._camera_requests = LatestSlot()  # (width, height, fps) to switch the camera to
+        self._frame_ready = threading.Event()
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='gesture-capture', daemon=True),
+            threading.Thread(target=self._inference_loop, name='gesture-inference', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running = False
+        self._frame_ready.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+
+    def _capture_loop(self):
+        read_stage = self.profiler.stage('cap.read')
+        while self._running:
+            request = self._camera_requests.take()
+            if request is not None:
+                self._configure_camera(*request)
+            with read_stage:
+                ret, frame = self.cap.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            self.metrics.frames_captured += 1
+            if self._frames.put((time.perf_counter(), frame)):
+                self.metrics.frames_dropped += 1
+            self._frame_ready.set()
+
+    def _inference_loop(self):
+        detect_stage = self.profiler.stage('detect')
+        while self._running:
+            self._frame_ready.wait()
+            self._frame_ready.clear()
+            item = self._frames.take()
+            if item is None:
+                continue
+            captured_at, frame = item
+
+            start = time.perf_counter()
+            with detect_stage:
+                gesture, frame = self.gesture_detector.detect(frame)
+            seconds = time.perf_counter() - start
+            self.metrics.inference_times.append(seconds)
+            self.metrics.frames_processed += 1
+            if self.controller is not None:
+                self.controller.observe(seconds)
+
+            if gesture is not None:
+                self.metrics.directions_published += 1
+                if self._directions.put((captured_at, gesture)):
+                    self.metrics.directions_dropped += 1
+            if self.preview:
+                detector = self.gesture_detector
+                self._previews.publish(frame, (detector.last_results, detector.last_crop, detector.frame_size))
+
+    def request_camera(self, width, height, fps):
+        """Ask for another camera mode; the capture thread applies it between reads."""
+        self._camera_requests.put((width, height, fps))
+
+    def _configure_camera(self, width, height, fps):
+        import cv2
+        cap = self.cap
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        # Cameras pick the nearest mode they support, or ignore the request
+        logger.info("camera asked for %dx%d at %d fps, running %dx%d at %.0f fps", width, height, fps,
+                    cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT),
+                    cap.get(cv2.CAP_PROP_FPS))
+
+    def poll_direction(self):
+        """Return the latest unread Direction, or None. Never blocks on inference."""
+        item = self._directions.take()
+        if item is None:
+            return None
+        captured_at, gesture = item
+        self.metrics.record_latency(time.perf_counter() - captured_at)
+        return gesture
+
+    def poll_frame(self):
+        """
+        Return the latest processed (flipped) frame for display, or None. The frame
+        stays valid until the next poll_frame(); preview_landmarks then describes it.
+        """
+        item = self._previews.take()
+        if item is None:
+            return None
+        frame, self.preview_landmarks = item
+        return frame
+
+    def timing_summary(self):
+        """Mean milliseconds per detect() stage, see GestureDetector.timing_summary()."""
+        return self.gesture_detector.timing_summary()
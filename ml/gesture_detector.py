@@ -1,87 +1,340 @@
-import cv2
-import mediapipe as mp
 import numpy as np
-from game.snake import Direction
+from ml.gesture_filter import GestureFilter, SECTOR_DIRECTIONS, angle_sectors, thumb_angles
 from collections import deque
 import time
 
+# OpenCV and MediaPipe take seconds to import, so they are loaded on first use
+cv2 = None
+mp = None
+
+def load_backends(mediapipe=True):
+    """Import OpenCV and MediaPipe once. Safe to call from a background thread."""
+    global cv2, mp
+    if cv2 is None:
+        import cv2 as _cv2
+        cv2 = _cv2
+    if mediapipe and mp is None:
+        import mediapipe as _mp
+        mp = _mp
+
 class GestureDetector:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+    NUM_LANDMARKS = 21
+
+    def __init__(self, inference_size=None, roi_tracking=False, roi_margin=0.6, roi_expand=1.5,
+                 gesture_filter=None, hands=None, model_complexity=1, inference_stride=1):
+        """
+        inference_size: (width, height) the model runs at. None keeps the camera
+            resolution; smaller sizes trade accuracy for CPU on low-end machines.
+        roi_tracking: crop around the last detected hand instead of processing the
+            whole frame. Crops are resized to inference_size (half the camera
+            resolution if unset) and grow by roi_expand each frame the hand is lost.
+        roi_margin: padding around the hand bounding box, as a fraction of its size.
+        gesture_filter: temporal filter for thumb angles (default GestureFilter());
+            pass False to classify every frame on its own.
+        hands: object with a MediaPipe-style process(rgb) method to use instead of
+            building mediapipe Hands, e.g. ml.gesture_recording.ReplayHands for headless runs.
+        model_complexity: MediaPipe Hands model, 0 (fastest) or 1.
+        inference_stride: run the model on every Nth frame only; in between, the
+            last landmarks are moved with optical flow.
+        """
+        load_backends(mediapipe=hands is None)
+        self.model_complexity = model_complexity
+        if hands is None:
+            self.mp_hands = mp.solutions.hands
+            self.hands = self._build_hands()
+            self.mp_drawing = mp.solutions.drawing_utils
+        else:
+            self.mp_hands = None
+            self.hands = hands
+            self.mp_drawing = None
+        # Majority vote with hysteresis over recent frames to suppress direction flips
+        self.gesture_filter = GestureFilter() if gesture_filter is None else gesture_filter
+        # Landmarks of the last detected hand as (x, y, z) rows, full-frame normalized
+        self.landmarks = np.zeros((self.NUM_LANDMARKS, 3), dtype=np.float32)
+        # Flat view of the same memory, so landmarks are copied in without temporaries
+        self._landmark_view = memoryview(self.landmarks).cast('B').cast('f')
+        self.last_gesture_time = 0
+        self.gesture_cooldown = 0.1  # Seconds between gesture detections
+        
+        self.inference_size = inference_size
+        self.roi_tracking = roi_tracking
+        self.roi_margin = roi_margin
+        self.roi_expand = roi_expand
+        self.roi = None  # (x0, y0, x1, y1) crop in pixels, None = whole frame
+        self.last_results = None
+        self.last_crop = None
+        self.frame_size = None  # (width, height) of the last camera frame
+        
+        # Frame skipping: landmarks are tracked with Lucas-Kanade flow between model runs
+        self.inference_stride = inference_stride
+        self._frame_index = 0
+        self._run_model_next = True
+        self._hand_visible = False
+        self._gray_buffers = [None, None]
+        self._prev_gray = None
+        self._flow_points = np.zeros((self.NUM_LANDMARKS, 1, 2), dtype=np.float32)
+        
+        # Preallocated outputs for cv2.flip/resize/cvtColor, reallocated only when
+        # the shape changes. Two flip buffers alternate so the frame handed back to
+        # the caller stays intact while the next one is being processed.
+        self._flip_buffers = [None, None]
+        self._flip_index = 0
+        self._resize_buffer = None
+        self._rgb_buffer = None
+        
+        self.stage_times = {stage: deque(maxlen=120)
+                            for stage in ('flip', 'preprocess', 'inference', 'postprocess', 'track')}
+
+    def _build_hands(self):
+        return self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=1,
+            model_complexity=self.model_complexity,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.5
         )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.hand_history = deque(maxlen=5)  # Track last 10 hand positions
-        self.last_gesture_time = 0
-        self.gesture_cooldown = 0.1  # Seconds between gesture detections
+
+    def set_model_complexity(self, model_complexity):
+        """Switch the MediaPipe model; rebuilding it takes a moment. Call from the detect() thread."""
+        if model_complexity == self.model_complexity:
+            return
+        self.model_complexity = model_complexity
+        if self.mp_hands is not None:
+            self.hands.close()
+            self.hands = self._build_hands()
+            self._run_model_next = True
+
+    def warm_up(self, width=640, height=480):
+        """Run the model once on a blank frame so the first real frame isn't slow."""
+        if self.inference_size is not None:
+            width, height = self.inference_size
+        self.hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+
+    @staticmethod
+    def _buffer(buffer, shape):
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def _target_size(self, frame_width, frame_height):
+        if self.inference_size is not None:
+            return self.inference_size
+        if self.roi_tracking:
+            return (frame_width // 2, frame_height // 2)
+        return (frame_width, frame_height)
+
+    def _preprocess(self, frame):
+        """Crop to the ROI, resize to the inference size and convert to RGB in place."""
+        frame_height, frame_width = frame.shape[:2]
+        x0, y0, x1, y1 = self.roi if self.roi is not None else (0, 0, frame_width, frame_height)
+        crop = frame[y0:y1, x0:x1]
+        self.last_crop = (x0, y0, x1, y1)
+        
+        width, height = self._target_size(frame_width, frame_height)
+        if (x1 - x0, y1 - y0) != (width, height):
+            self._resize_buffer = self._buffer(self._resize_buffer, (height, width, 3))
+            crop = cv2.resize(crop, (width, height), dst=self._resize_buffer, interpolation=cv2.INTER_AREA)
+        self._rgb_buffer = self._buffer(self._rgb_buffer, (height, width, 3))
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+
+    def _to_frame_coords(self, landmarks, frame_width, frame_height):
+        """Fill self.landmarks from MediaPipe output, mapped to full-frame coordinates."""
+        view = self._landmark_view
+        i = 0
+        for lm in landmarks.landmark:
+            view[i] = lm.x
+            view[i + 1] = lm.y
+            view[i + 2] = lm.z
+            i += 3
+        points = self.landmarks
+        x0, y0, x1, y1 = self.last_crop
+        if (x0, y0, x1, y1) != (0, 0, frame_width, frame_height):
+            points[:, 0] *= (x1 - x0) / frame_width
+            points[:, 0] += x0 / frame_width
+            points[:, 1] *= (y1 - y0) / frame_height
+            points[:, 1] += y0 / frame_height
+        return points
+
+    def _update_roi(self, hand_points, frame_width, frame_height):
+        """Track the hand with a crop of the inference aspect ratio, or widen it on loss."""
+        if not self.roi_tracking:
+            return
+        target_width, target_height = self._target_size(frame_width, frame_height)
+        aspect = target_width / target_height
+        
+        if hand_points is None:
+            if self.roi is None:
+                return
+            x0, y0, x1, y1 = self.roi
+            cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+            width = (x1 - x0) * self.roi_expand
+        else:
+            x_min, y_min = hand_points[:, :2].min(axis=0)
+            x_max, y_max = hand_points[:, :2].max(axis=0)
+            x_min, x_max = x_min * frame_width, x_max * frame_width
+            y_min, y_max = y_min * frame_height, y_max * frame_height
+            cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+            pad = 1 + 2 * self.roi_margin
+            width = max((x_max - x_min) * pad, (y_max - y_min) * pad * aspect)
+        
+        # Never zoom in further than a quarter of the frame width
+        width = min(max(width, frame_width / 4), frame_width, frame_height * aspect)
+        height = width / aspect
+        if width >= frame_width - 1 or height >= frame_height - 1:
+            # Crop has grown to the whole frame: fall back to full-frame search
+            self.roi = None
+            return
+        x0 = int(min(max(cx - width / 2, 0), frame_width - width))
+        y0 = int(min(max(cy - height / 2, 0), frame_height - height))
+        self.roi = (x0, y0, x0 + int(width), y0 + int(height))
 
     def detect(self, frame):
         """
         Detect hand gestures from a video frame.
-        Returns a Direction or None.
+        Returns a Direction or None, and the mirrored frame. The returned frame lives
+        in a reused buffer and stays valid until the next-but-one call.
         """
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        t0 = time.perf_counter()
+        buffer = self._buffer(self._flip_buffers[self._flip_index], frame.shape)
+        self._flip_buffers[self._flip_index] = buffer
+        self._flip_index ^= 1
+        frame = cv2.flip(frame, 1, dst=buffer)
+        frame_height, frame_width = frame.shape[:2]
+        if self.frame_size != (frame_width, frame_height):
+            # The camera changed resolution: crops and tracked points no longer apply
+            self.roi = None
+            self._run_model_next = True
+        self.frame_size = (frame_width, frame_height)
+        self._frame_index += 1
+        
+        if (self.inference_stride > 1 and not self._run_model_next and self._prev_gray is not None
+                and self._frame_index % self.inference_stride):
+            # Skipped frame: follow a visible hand, otherwise wait for the next model run
+            t1 = time.perf_counter()
+            gesture = None
+            if self._hand_visible:
+                hand_points = self._track(frame)
+                if hand_points is None:
+                    # Flow lost the points; the model decides whether the hand is gone
+                    self._run_model_next = True
+                else:
+                    gesture = self._update_hand(hand_points, frame_width, frame_height)
+            self.stage_times['flip'].append(t1 - t0)
+            self.stage_times['track'].append(time.perf_counter() - t1)
+            return gesture, frame
         
-        gesture = None
+        t1 = time.perf_counter()
+        rgb_frame = self._preprocess(frame)
         
+        t2 = time.perf_counter()
+        results = self.hands.process(rgb_frame)
+        self.last_results = results
+        self._run_model_next = False
+        
+        t3 = time.perf_counter()
+        hand_points = None
         if results.multi_hand_landmarks:
-            landmarks = results.multi_hand_landmarks[0]
-            
-            # Get hand landmarks
-            hand_points = [(lm.x, lm.y, lm.z) for lm in landmarks.landmark]
-            
-            # Detect gesture based on thumb direction
-            current_time = time.time()
-            if current_time - self.last_gesture_time > self.gesture_cooldown:
-                gesture = self._classify_gesture(hand_points)
-                if gesture:
-                    self.last_gesture_time = current_time
-        else:
-            self.hand_history.clear()
+            # Get hand landmarks in full-frame coordinates
+            hand_points = self._to_frame_coords(results.multi_hand_landmarks[0], frame_width, frame_height)
+        gesture = self._update_hand(hand_points, frame_width, frame_height)
+        # Only kept while frames are skipped, so a later stride change never tracks from a stale frame
+        self._prev_gray = self._grayscale(frame) if self.inference_stride > 1 else None
+        
+        t4 = time.perf_counter()
+        self.stage_times['flip'].append(t1 - t0)
+        self.stage_times['preprocess'].append(t2 - t1)
+        self.stage_times['inference'].append(t3 - t2)
+        self.stage_times['postprocess'].append(t4 - t3)
         
         return gesture, frame
 
+    def _update_hand(self, hand_points, frame_width, frame_height):
+        """Follow the hand with the ROI and turn its thumb into a rate-limited Direction."""
+        self._hand_visible = hand_points is not None
+        self._update_roi(hand_points, frame_width, frame_height)
+        if hand_points is None:
+            if self.gesture_filter:
+                self.gesture_filter.reset()
+            return None
+        
+        # Detect gesture based on thumb direction, smoothed over recent frames
+        if self.gesture_filter:
+            candidate = self.gesture_filter.update(float(thumb_angles(hand_points)))
+        else:
+            candidate = self._classify_gesture(hand_points)
+        current_time = time.time()
+        if candidate and current_time - self.last_gesture_time > self.gesture_cooldown:
+            self.last_gesture_time = current_time
+            return candidate
+        return None
+
+    def _grayscale(self, frame):
+        # Two buffers alternate so the previous frame survives for optical flow
+        index = 0 if self._gray_buffers[0] is not self._prev_gray else 1
+        buffer = self._gray_buffers[index]
+        if buffer is None or buffer.shape != frame.shape[:2]:
+            buffer = self._gray_buffers[index] = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=buffer)
+
+    def _track(self, frame):
+        """
+        Move the last landmarks onto frame with pyramidal Lucas-Kanade optical flow.
+        Returns them, or None when too many points were lost.
+        """
+        gray = self._grayscale(frame)
+        height, width = gray.shape
+        points = self._flow_points
+        points[:, 0, 0] = self.landmarks[:, 0] * width
+        points[:, 0, 1] = self.landmarks[:, 1] * height
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, points, None,
+                                                    winSize=(15, 15), maxLevel=2)
+        self._prev_gray = gray
+        if moved is None:
+            return None
+        found = status[:, 0] == 1
+        if found.sum() < 0.75 * self.NUM_LANDMARKS:
+            return None
+        self.landmarks[found, 0] = moved[found, 0, 0] / width
+        self.landmarks[found, 1] = moved[found, 0, 1] / height
+        return self.landmarks
+
+    def timing_summary(self):
+        """Mean milliseconds per detect() stage over recent frames."""
+        return {
+            stage: 1000 * sum(samples) / len(samples) if samples else 0.0
+            for stage, samples in self.stage_times.items()
+        }
+
     def _classify_gesture(self, landmarks):
         """
         Classify gesture based on thumb direction.
-        landmarks: list of (x, y, z) tuples for 21 hand points
+        landmarks: (21, 3) array of (x, y, z) rows for the hand points
         """
         # Thumb points: 0=wrist, 1=CMC, 2=MCP, 3=IP, 4=thumb tip
-        wrist = landmarks[0]
-        thumb_tip = landmarks[4]
-        
-        # Vector from wrist to thumb tip
-        dx = thumb_tip[0] - wrist[0]
-        dy = thumb_tip[1] - wrist[1]
-        
-        # Calculate angle of thumb direction
-        angle = np.arctan2(dy, dx)
-        
-        # Determine direction based on thumb angle
-        # Up: -3pi/4 to -pi/4
-        if -np.pi * 0.75 < angle < -np.pi * 0.25:
-            return Direction.DOWN
-        # Right: -pi/4 to pi/4
-        elif -np.pi * 0.25 < angle < np.pi * 0.25:
-            return Direction.LEFT
-        # Down: pi/4 to 3pi/4
-        elif np.pi * 0.25 < angle < np.pi * 0.75:
-            return Direction.UP
-        # Left: 3pi/4 to pi or -3pi/4 to -pi
-        elif angle > np.pi * 0.75 or angle < -np.pi * 0.75:
-            return Direction.RIGHT
-        
-        return None
+        # Angle of the wrist -> thumb tip vector, bucketed into quarter turns:
+        # (-pi/4, pi/4) LEFT, (pi/4, 3pi/4) UP, beyond 3pi/4 RIGHT, (-3pi/4, -pi/4) DOWN
+        angle = thumb_angles(np.asarray(landmarks))
+        return SECTOR_DIRECTIONS[int(angle_sectors(angle))]
 
-    def draw_landmarks(self, frame, results):
-        """Draw hand landmarks on frame for debugging."""
-        if results.multi_hand_landmarks:
+    def draw_landmarks(self, frame, results, crop=None, frame_size=None):
+        """
+        Draw hand landmarks on frame for debugging. frame may be a resized copy of
+        the camera frame, e.g. a preview thumbnail. crop and frame_size are the
+        last_crop and frame_size results were produced with; they are passed in
+        rather than read here, because detect() may already be on the next frame.
+        """
+        if results.multi_hand_landmarks and self.mp_drawing is not None:
+            # Landmarks are relative to the region the model saw
+            target = frame
+            if crop is not None:
+                x0, y0, x1, y1 = crop
+                if frame_size is not None:
+                    # The crop is in camera pixels; scale it to this frame
+                    scale_x = frame.shape[1] / frame_size[0]
+                    scale_y = frame.shape[0] / frame_size[1]
+                    x0, x1 = int(x0 * scale_x), int(x1 * scale_x)
+                    y0, y1 = int(y0 * scale_y), int(y1 * scale_y)
+                target = frame[y0:y1, x0:x1]
             for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
+                self.mp_drawing.draw_landmarks(target, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
         return frame
@@ -0,0 +1,71 @@
+import numpy as np
+from game.snake import Direction
+
+# Thumb angle sectors, each a quarter turn centered on k * pi/2. Image y grows
+# downwards and the detector's mapping is mirrored, so sector 0 (pointing +x) is LEFT.
+SECTOR_DIRECTIONS = (Direction.LEFT, Direction.UP, Direction.RIGHT, Direction.DOWN)
+QUARTER_TURN = np.pi / 2
+
+
+def angle_sectors(angles):
+    """Vectorized: sector index 0-3 for each angle in radians."""
+    return (np.floor((np.asarray(angles) + np.pi / 4) / QUARTER_TURN).astype(np.int64)) % 4
+
+
+def thumb_angles(landmarks):
+    """
+    Vectorized: angle of the wrist -> thumb tip vector.
+    landmarks: array of shape (..., 21, 3); returns an array of shape (...).
+    """
+    delta = landmarks[..., 4, :2] - landmarks[..., 0, :2]
+    return np.arctan2(delta[..., 1], delta[..., 0])
+
+
+class GestureFilter:
+    """
+    Temporal smoothing of thumb angles into stable directions.
+
+    Each frame's angle is mapped to a sector with hysteresis: the previous sector is
+    kept until the angle is more than `hysteresis` radians past its 45 degree
+    boundary, so a thumb held near a diagonal doesn't flicker. Sectors go into a ring
+    buffer and a direction is only reported once it holds a majority of `min_votes`
+    among the last `window` frames.
+
+    The defaults were tuned with benchmarks/bench_gesture.py: a longer window or more
+    votes mostly delays each real turn, which costs more correct frames than the
+    outliers it suppresses.
+    """
+
+    def __init__(self, window=3, min_votes=2, hysteresis=np.radians(5)):
+        self.window = window
+        self.min_votes = min_votes
+        self.hysteresis = hysteresis
+        self._votes = np.full(window, -1, dtype=np.int64)
+        self._index = 0
+        self._sector = None
+
+    def reset(self):
+        """Forget history, e.g. when the hand leaves the frame."""
+        self._votes.fill(-1)
+        self._index = 0
+        self._sector = None
+
+    def _sector_with_hysteresis(self, angle):
+        sector = int(angle_sectors(angle))
+        if self._sector is not None and sector != self._sector:
+            # Signed distance from the current sector's center, wrapped to [-pi, pi)
+            offset = (angle - self._sector * QUARTER_TURN + np.pi) % (2 * np.pi) - np.pi
+            if abs(offset) < np.pi / 4 + self.hysteresis:
+                sector = self._sector
+        self._sector = sector
+        return sector
+
+    def update(self, angle):
+        """Add one frame's thumb angle. Returns the majority Direction, or None."""
+        self._votes[self._index] = self._sector_with_hysteresis(angle)
+        self._index = (self._index + 1) % self.window
+        counts = np.bincount(self._votes[self._votes >= 0], minlength=4)
+        best = int(counts.argmax())
+        if counts[best] >= self.min_votes:
+            return SECTOR_DIRECTIONS[best]
+        return None
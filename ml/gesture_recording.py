@@ -0,0 +1,320 @@
+"""
+Record webcam sessions and replay them headless through GestureDetector.
+
+A recording is two files sharing a path prefix:
+
+    <prefix>.frames     16-byte header, then raw BGR uint8 frames back to back,
+                        readable as one memory-mapped (n, height, width, 3) array
+    <prefix>.landmarks  16-byte header, then one fixed-size LANDMARK_RECORD per
+                        frame: timestamp, ground-truth label, hand flag and the
+                        (21, 3) landmarks in mirrored full-frame coordinates
+
+Labels are Direction codes in declaration order (0=UP, 1=DOWN, 2=LEFT, 3=RIGHT),
+or -1 when unlabeled.
+"""
+import argparse
+import os
+import struct
+import time
+import types
+
+import numpy as np
+
+from game.snake import Direction
+from ml.gesture_filter import SECTOR_DIRECTIONS
+
+FRAMES_MAGIC = b'SGFR'
+LANDMARKS_MAGIC = b'SGLM'
+FORMAT_VERSION = 1
+# magic, version, width, height, channels, reserved
+HEADER = struct.Struct('<4sHHHHI')
+
+NUM_LANDMARKS = 21
+LANDMARK_RECORD = np.dtype([
+    ('timestamp', '<f8'),
+    ('label', 'i1'),
+    ('has_hand', 'u1'),
+    ('landmarks', '<f4', (NUM_LANDMARKS, 3)),
+])
+
+DIRECTIONS = list(Direction)
+NO_LABEL = -1
+
+# cv2.CAP_PROP_* ids, so ReplayCapture.get() works without importing OpenCV
+CAP_PROP_POS_FRAMES = 1
+CAP_PROP_FRAME_WIDTH = 3
+CAP_PROP_FRAME_HEIGHT = 4
+CAP_PROP_FPS = 5
+CAP_PROP_FRAME_COUNT = 7
+
+
+def label_code(direction):
+    return NO_LABEL if direction is None else DIRECTIONS.index(direction)
+
+
+class RecordingWriter:
+    """Appends frames and their landmark records to a recording."""
+
+    def __init__(self, prefix, width, height, channels=3):
+        self.prefix = prefix
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.frame_count = 0
+        self._frames = open(prefix + '.frames', 'wb')
+        self._landmarks = open(prefix + '.landmarks', 'wb')
+        self._frames.write(HEADER.pack(FRAMES_MAGIC, FORMAT_VERSION, width, height, channels, 0))
+        self._landmarks.write(HEADER.pack(LANDMARKS_MAGIC, FORMAT_VERSION, width, height, channels, 0))
+        self._record = np.zeros(1, dtype=LANDMARK_RECORD)
+
+    def write(self, frame, landmarks=None, label=None, timestamp=None):
+        """
+        frame: raw (unmirrored) BGR frame as read from the camera.
+        landmarks: (21, 3) array in the detector's mirrored full-frame coordinates,
+            or None if no hand was seen.
+        label: ground-truth Direction for this frame, or None.
+        """
+        if frame.shape != (self.height, self.width, self.channels):
+            raise ValueError(f"frame shape {frame.shape} does not match recording "
+                             f"{(self.height, self.width, self.channels)}")
+        self._frames.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+
+        record = self._record
+        record['timestamp'] = time.time() if timestamp is None else timestamp
+        record['label'] = label_code(label)
+        record['has_hand'] = landmarks is not None
+        record['landmarks'] = 0.0 if landmarks is None else landmarks
+        self._landmarks.write(record.tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        self._frames.close()
+        self._landmarks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Recording:
+    """Memory-mapped read access to a recording."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        with open(prefix + '.frames', 'rb') as f:
+            magic, version, width, height, channels, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != FRAMES_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{prefix}.frames is not a version {FORMAT_VERSION} frame recording")
+        self.width, self.height, self.channels = width, height, channels
+
+        frame_bytes = width * height * channels
+        count = (os.path.getsize(prefix + '.frames') - HEADER.size) // frame_bytes
+        self.frames = np.memmap(prefix + '.frames', dtype=np.uint8, mode='r', offset=HEADER.size,
+                                shape=(count, height, width, channels))
+
+        with open(prefix + '.landmarks', 'rb') as f:
+            magic, version = HEADER.unpack(f.read(HEADER.size))[:2]
+            if magic != LANDMARKS_MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{prefix}.landmarks is not a version {FORMAT_VERSION} landmark stream")
+            self.records = np.fromfile(f, dtype=LANDMARK_RECORD)
+        # A recording cut short may have one more frame than landmark record
+        self.frame_count = min(count, len(self.records))
+
+    def __len__(self):
+        return self.frame_count
+
+    def label(self, index):
+        code = int(self.records['label'][index])
+        return None if code == NO_LABEL else DIRECTIONS[code]
+
+
+class ReplayCapture:
+    """Stands in for cv2.VideoCapture, serving frames from a Recording."""
+
+    def __init__(self, recording, loop=False, fps=None):
+        """fps: pace read() to this rate like a real camera; None serves frames as fast as asked."""
+        self.recording = recording
+        self.loop = loop
+        self.fps = fps
+        self.position = 0  # index of the next frame read() returns
+        self._opened = True
+        self._next_time = None
+
+    def isOpened(self):
+        return self._opened
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        if self.position >= len(self.recording):
+            if not self.loop or len(self.recording) == 0:
+                return False, None
+            self.position = 0
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_time is not None and now < self._next_time:
+                time.sleep(self._next_time - now)
+            self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+        frame = self.recording.frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        if prop == CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == CAP_PROP_FRAME_WIDTH:
+            return float(self.recording.width)
+        if prop == CAP_PROP_FRAME_HEIGHT:
+            return float(self.recording.height)
+        if prop == CAP_PROP_FPS:
+            return float(self.fps or 0)
+        if prop == CAP_PROP_FRAME_COUNT:
+            return float(len(self.recording))
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == CAP_PROP_POS_FRAMES:
+            self.position = int(value)
+            return True
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+class ReplayHands:
+    """
+    Stands in for mediapipe Hands, returning the recorded landmarks of the frame
+    the capture last served. Landmarks are mapped into the detector's current crop
+    so ROI tracking behaves as it would live.
+    """
+
+    def __init__(self, recording, capture):
+        self.recording = recording
+        self.capture = capture
+        self.detector = None
+
+    def attach(self, detector):
+        self.detector = detector
+
+    def process(self, rgb_frame):
+        results = types.SimpleNamespace(multi_hand_landmarks=None)
+        index = self.capture.position - 1
+        if index < 0 or not self.recording.records['has_hand'][index]:
+            return results
+
+        points = self.recording.records['landmarks'][index].astype(np.float64)
+        crop = self.detector.last_crop if self.detector is not None else None
+        if crop is not None:
+            x0, y0, x1, y1 = crop
+            points[:, 0] = (points[:, 0] * self.recording.width - x0) / (x1 - x0)
+            points[:, 1] = (points[:, 1] * self.recording.height - y0) / (y1 - y0)
+        landmark = [types.SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()]
+        results.multi_hand_landmarks = [types.SimpleNamespace(landmark=landmark)]
+        return results
+
+
+def open_replay(prefix, loop=False, fps=None, use_mediapipe=False, **detector_options):
+    """
+    Build (capture, detector) for headless replay of a recording. With
+    use_mediapipe=False the recorded landmarks replace model inference, so no
+    MediaPipe install or GPU is needed.
+    """
+    from ml.gesture_detector import GestureDetector
+
+    recording = Recording(prefix)
+    capture = ReplayCapture(recording, loop=loop, fps=fps)
+    if use_mediapipe:
+        return capture, GestureDetector(**detector_options)
+    hands = ReplayHands(recording, capture)
+    detector = GestureDetector(hands=hands, **detector_options)
+    hands.attach(detector)
+    return capture, detector
+
+
+def synthesize_recording(prefix, frame_count=600, width=320, height=240, hold_frames=20,
+                         noise_degrees=20.0, outlier_rate=0.08, drop_rate=0.05, seed=0):
+    """
+    Write a synthetic labeled recording: a thumb that points in a random direction for
+    hold_frames frames at a time, with angular jitter, single-frame outliers pointing
+    anywhere (what a misdetected hand looks like) and occasional lost hands.
+    Frames are cheap procedural images; the landmarks carry the signal.
+    """
+    rng = np.random.default_rng(seed)
+    sector_centers = {direction: k * np.pi / 2 for k, direction in enumerate(SECTOR_DIRECTIONS)}
+    base = np.linspace(0, 255, width, dtype=np.uint8)[np.newaxis, :, np.newaxis]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    landmarks = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+
+    with RecordingWriter(prefix, width, height) as writer:
+        direction = DIRECTIONS[0]
+        for i in range(frame_count):
+            if i % hold_frames == 0:
+                direction = DIRECTIONS[rng.integers(len(DIRECTIONS))]
+            frame[:] = base
+            frame[:, :, 1] = (i * 3) % 256
+
+            if rng.random() < drop_rate:
+                writer.write(frame, None, direction, timestamp=i / 30.0)
+                continue
+            angle = sector_centers[direction] + np.radians(rng.normal(0.0, noise_degrees))
+            if rng.random() < outlier_rate:
+                angle = rng.uniform(-np.pi, np.pi)
+            wrist = np.array([0.5, 0.6]) + rng.normal(0.0, 0.01, size=2)
+            landmarks[:, :2] = wrist + rng.normal(0.0, 0.03, size=(NUM_LANDMARKS, 2))
+            landmarks[0, :2] = wrist
+            landmarks[4, :2] = wrist + 0.15 * np.array([np.cos(angle), np.sin(angle)])
+            writer.write(frame, landmarks, direction, timestamp=i / 30.0)
+
+
+def record_session(prefix, seconds, label=None, camera_index=0, **detector_options):
+    """Record a live webcam session, storing the detector's landmarks for each frame."""
+    from ml.gesture_detector import GestureDetector, load_backends
+    load_backends()
+    import cv2
+
+    cap = cv2.VideoCapture(camera_index)
+    ret, frame = cap.read()
+    if not ret:
+        cap.release()
+        raise RuntimeError("could not read from the camera")
+    detector = GestureDetector(**detector_options)
+    height, width = frame.shape[:2]
+    end = time.time() + seconds
+    with RecordingWriter(prefix, width, height) as writer:
+        while ret and time.time() < end:
+            detector.detect(frame)
+            hand = detector.landmarks if detector.last_results.multi_hand_landmarks else None
+            writer.write(frame, hand, label)
+            ret, frame = cap.read()
+    cap.release()
+    return writer.frame_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or synthesize gesture recordings")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help="record a live webcam session")
+    rec.add_argument('prefix')
+    rec.add_argument('--seconds', type=float, default=10.0)
+    rec.add_argument('--label', choices=[d.name for d in DIRECTIONS],
+                     help="ground-truth direction held during the whole session")
+    syn = sub.add_parser('synthesize', help="write a synthetic labeled recording")
+    syn.add_argument('prefix')
+    syn.add_argument('--frames', type=int, default=600)
+    syn.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        label = Direction[args.label] if args.label else None
+        count = record_session(args.prefix, args.seconds, label)
+    else:
+        synthesize_recording(args.prefix, frame_count=args.frames, seed=args.seed)
+        count = args.frames
+    print(f"Wrote {count} frames to {args.prefix}.frames / {args.prefix}.landmarks")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import threading
+from ml.capture_pipeline import CapturePipeline
+
+
+class GestureStack:
+    """
+    Loads the gesture backend off the main thread: OpenCV and MediaPipe imports,
+    the Hands model, a warm-up inference and the webcam. The menu stays interactive
+    meanwhile; until ready is True the stack simply reports no gestures.
+
+    The webcam preview is one of PREVIEW_MODES: a thumbnail the game draws inside
+    its own window (default), the legacy separate OpenCV window, or off.
+    """
+
+    WINDOW_NAME = 'Gesture Detection'
+    PREVIEW_MODES = ('thumbnail', 'window', 'off')
+
+    def __init__(self, timer, camera_index=0, detector_options=None, profiler=None, process_inference=False,
+                 preview='thumbnail', preview_height=120, preview_landmarks=False, latency_budget=None):
+        """
+        process_inference: run detection in a separate process (ProcessCapturePipeline).
+        preview_height: thumbnail height in pixels; its width follows the camera's
+            aspect ratio. Read when the first frame arrives.
+        preview_landmarks: draw the detected hand on the thumbnail (in-process only).
+        latency_budget: milliseconds per frame; adapt camera mode, frame skipping and
+            model complexity to stay within it (ml.adaptive, in-process only).
+        """
+        if preview not in self.PREVIEW_MODES:
+            raise ValueError(f"preview must be one of {self.PREVIEW_MODES}")
+        if latency_budget is not None and process_inference:
+            raise ValueError("latency_budget needs in-process inference")
+        self.timer = timer
+        self.profiler = profiler
+        self.process_inference = process_inference
+        self.preview = preview
+        self.preview_height = preview_height
+        self.preview_landmarks = preview_landmarks
+        self.thumbnail = None  # PreviewThumbnail once the first frame arrives
+        self.latency_budget = latency_budget
+        self.controller = None
+        self.camera_index = camera_index
+        self.detector_options = detector_options or {}
+        self.pipeline = None
+        self.error = None
+        self._cv2 = None
+        self._cap = None
+        self._preview_shown = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._load, name='gesture-warmup', daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        if self.process_inference:
+            self._load_process()
+            return
+        try:
+            with self.timer.phase('import opencv+mediapipe'):
+                from ml.gesture_detector import GestureDetector, load_backends
+                load_backends()
+                import cv2
+            with self.timer.phase('build hands model'):
+                detector = GestureDetector(**self.detector_options)
+            with self.timer.phase('warm up model'):
+                detector.warm_up()
+            with self.timer.phase('open camera'):
+                cap = cv2.VideoCapture(self.camera_index)
+        except Exception as exc:
+            self.error = exc
+            return
+
+        with self._lock:
+            if self._closed:
+                cap.release()
+                return
+            self._cv2 = cv2
+            self._cap = cap
+            self.pipeline = CapturePipeline(cap, detector, self.profiler, preview=self.preview != 'off')
+            if self.latency_budget is not None:
+                from ml.adaptive import AdaptiveController
+                self.controller = AdaptiveController(self.pipeline, self.latency_budget)
+                self.pipeline.controller = self.controller
+                self.controller.start()
+            self.pipeline.start()
+        self.timer.mark('gestures ready')
+        self._ready.set()
+
+    def _load_process(self):
+        # MediaPipe is only imported by the worker process
+        from ml.process_inference import ProcessCapturePipeline
+        try:
+            with self.timer.phase('import opencv'):
+                from ml.gesture_detector import load_backends
+                load_backends(mediapipe=False)
+                import cv2
+            with self.timer.phase('open camera'):
+                cap = cv2.VideoCapture(self.camera_index)
+            with self.timer.phase('start inference process'):
+                try:
+                    pipeline = ProcessCapturePipeline(cap, self.detector_options, self.profiler,
+                                                      preview=self.preview != 'off')
+                    pipeline.start()
+                except Exception:
+                    # The camera is ours until a pipeline has started with it
+                    cap.release()
+                    raise
+        except Exception as exc:
+            self.error = exc
+            return
+
+        with self._lock:
+            if self._closed:
+                pipeline.stop()
+                cap.release()
+                return
+            self._cv2 = cv2
+            self._cap = cap
+            self.pipeline = pipeline
+        self.timer.mark('gestures ready')
+        self._ready.set()
+
+    def poll_direction(self):
+        """Latest detected Direction, or None while loading or when nothing new."""
+        if not self.ready:
+            return None
+        return self.pipeline.poll_direction()
+
+    def update_preview(self):
+        """
+        Refresh the preview from the latest processed frame, if there is one; in
+        thumbnail mode, thumbnail.updates counts the frames it has shown.
+        Returns False once the user has closed the preview window (window mode).
+        """
+        if not self.ready or self.preview == 'off':
+            return True
+        cv2 = self._cv2
+        frame = self.pipeline.poll_frame()
+        if self.preview == 'thumbnail':
+            if frame is not None:
+                if self.thumbnail is None:
+                    from ml.preview import PreviewThumbnail
+                    height = self.preview_height
+                    size = (round(height * frame.shape[1] / frame.shape[0]), height)
+                    self.thumbnail = PreviewThumbnail(cv2, size, self.preview_landmarks)
+                # Only the in-process pipeline has landmarks to draw
+                self.thumbnail.update(frame, getattr(self.pipeline, 'gesture_detector', None),
+                                      getattr(self.pipeline, 'preview_landmarks', None))
+            return True
+        if frame is not None:
+            cv2.imshow(self.WINDOW_NAME, frame)
+            self._preview_shown = True
+        cv2.waitKey(1)
+        return not (self._preview_shown and cv2.getWindowProperty(self.WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self.pipeline is not None:
+                self.pipeline.stop()
+            if self._cap is not None:
+                self._cap.release()
+            if self._cv2 is not None:
+                self._cv2.destroyAllWindows()
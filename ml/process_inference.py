@@ -0,0 +1,301 @@
+"""
+Gesture inference in a separate process, so MediaPipe and the OpenCV preprocessing
+never compete with the game loop for the interpreter.
+
+Frames travel through a multiprocessing.shared_memory ring: the capture thread
+copies each camera frame into a free slot and only the slot number crosses the
+pipe. The worker runs GestureDetector.detect() on a NumPy view of that slot,
+writes the mirrored preview frame back into the same slot and answers with the
+Direction code. As with CapturePipeline, only the newest frame waits for the
+worker; frames captured while it is busy replace each other and count as dropped.
+
+Slots are in one of these states: being written by the capture thread, pending
+(waiting for the worker), in flight (being processed), preview ready (processed,
+not yet displayed) and preview held (returned by poll_frame() and still on screen),
+so the ring needs at least five.
+"""
+import multiprocessing
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from game.profiler import Profiler
+from game.snake import Direction
+from ml.capture_pipeline import LatestSlot, PipelineMetrics
+
+DIRECTIONS = list(Direction)
+NO_DIRECTION = -1
+MIN_SLOTS = 5
+
+
+class SharedFrameRing:
+    """`slots` uint8 frames of one shape in a shared memory block, as NumPy views."""
+
+    def __init__(self, slots, shape, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.owner = name is None
+        size = slots * int(np.prod(self.shape))
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.name = self.shm.name
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def close(self):
+        # Views must be released before the mapping can be closed; one still held by
+        # a caller keeps it alive until garbage collection, which is harmless
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(ring_name, slots, shape, detector_options, hands_factory, preview, requests, results):
+    """Entry point of the inference process."""
+    # Ctrl+C reaches the whole process group; the parent decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = SharedFrameRing(slots, shape, name=ring_name)
+    try:
+        from ml.gesture_detector import GestureDetector
+        hands = hands_factory() if hands_factory is not None else None
+        detector = GestureDetector(hands=hands, **detector_options)
+        detector.warm_up(shape[1], shape[0])
+    except Exception as exc:
+        results.send(('error', repr(exc)))
+        ring.close()
+        return
+    results.send(('ready', None))
+
+    try:
+        while True:
+            request = requests.recv()
+            if request is None:
+                break
+            slot = request
+            start = time.perf_counter()
+            gesture, frame = detector.detect(ring.frames[slot])
+            if preview:
+                np.copyto(ring.frames[slot], frame)
+            code = NO_DIRECTION if gesture is None else DIRECTIONS.index(gesture)
+            results.send(('result', (slot, code, time.perf_counter() - start)))
+        results.send(('timing', detector.timing_summary()))
+    except (EOFError, BrokenPipeError):
+        pass  # Parent went away
+    finally:
+        ring.close()
+
+
+class ProcessCapturePipeline:
+    """
+    Drop-in replacement for CapturePipeline that runs detection in a worker process.
+    The camera stays in this process; start() reads one frame to size the ring,
+    spawns the worker and blocks until its model is loaded.
+    """
+
+    def __init__(self, cap, detector_options=None, profiler=None, slots=MIN_SLOTS, hands_factory=None,
+                 start_timeout=60.0, preview=True):
+        """
+        hands_factory: picklable callable building a MediaPipe-style hands object in
+            the worker, instead of the real model (see GestureDetector's hands=).
+        preview: have the worker write mirrored frames back for poll_frame().
+        """
+        if slots < MIN_SLOTS:
+            raise ValueError(f"the frame ring needs at least {MIN_SLOTS} slots")
+        self.cap = cap
+        self.detector_options = detector_options or {}
+        self.profiler = profiler or Profiler()
+        self.slots = slots
+        self.hands_factory = hands_factory
+        self.start_timeout = start_timeout
+        self.preview = preview
+        self.metrics = PipelineMetrics()
+        self.ring = None
+        self.process = None
+
+        self._lock = threading.Lock()
+        self._directions = LatestSlot()  # (capture_time, Direction) for the game loop
+        self._captured_at = [0.0] * slots
+        self._pending = None
+        self._in_flight = None
+        self._preview_ready = None
+        self._preview_held = None
+        self._requests = None
+        self._results = None
+        self._timing = {}
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        if self._running:
+            return
+        ret, frame = self.cap.read()
+        if not ret:
+            raise RuntimeError("could not read from the camera")
+        self.ring = SharedFrameRing(self.slots, frame.shape)
+
+        # spawn, not fork: the parent already runs SDL and other threads
+        context = multiprocessing.get_context('spawn')
+        worker_requests, self._requests = context.Pipe(duplex=False)
+        self._results, worker_results = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_worker_main, name='gesture-inference', daemon=True,
+            args=(self.ring.name, self.slots, frame.shape, self.detector_options, self.hands_factory,
+                  self.preview, worker_requests, worker_results))
+        self.process.start()
+        # Keep only our ends, so either side sees EOF when the other exits
+        worker_requests.close()
+        worker_results.close()
+
+        try:
+            if not self._results.poll(self.start_timeout):
+                raise RuntimeError("inference process did not start in time")
+            kind, payload = self._results.recv()
+        except EOFError:
+            kind, payload = 'error', f"exited with code {self.process.exitcode}"
+        except RuntimeError:
+            self._shutdown()
+            raise
+        if kind != 'ready':
+            self._shutdown()
+            raise RuntimeError(f"inference process failed to start: {payload}")
+
+        self._running = True
+        self._submit(frame, time.perf_counter())
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='gesture-capture', daemon=True),
+            threading.Thread(target=self._result_loop, name='gesture-results', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _free_slot(self):
+        busy = (self._pending, self._in_flight, self._preview_ready, self._preview_held)
+        for slot in range(self.slots):
+            if slot not in busy:
+                return slot
+        return None
+
+    def _submit(self, frame, captured_at):
+        """Copy frame into a free slot, then hand it to the worker or leave it pending."""
+        with self._lock:
+            slot = self._free_slot()
+        # Only this thread claims free slots, so the slot stays free while we copy
+        np.copyto(self.ring.frames[slot], frame)
+        self._captured_at[slot] = captured_at
+        self.metrics.frames_captured += 1
+        with self._lock:
+            if self._in_flight is None:
+                self._send(slot)
+            else:
+                if self._pending is not None:
+                    self.metrics.frames_dropped += 1
+                self._pending = slot
+
+    def _send(self, slot):
+        # Called with the lock held
+        try:
+            self._requests.send(slot)
+            self._in_flight = slot
+        except OSError:
+            self._running = False
+
+    def _capture_loop(self):
+        read_stage = self.profiler.stage('cap.read')
+        shape = self.ring.shape
+        while self._running:
+            with read_stage:
+                ret, frame = self.cap.read()
+            if not ret or frame.shape != shape:
+                time.sleep(0.01)
+                continue
+            self._submit(frame, time.perf_counter())
+
+    def _result_loop(self):
+        detect_stage = self.profiler.stage('detect')
+        while True:
+            try:
+                kind, payload = self._results.recv()
+            except (EOFError, OSError):
+                break
+            if kind == 'timing':
+                self._timing = payload
+                break
+            slot, code, seconds = payload
+            captured_at = self._captured_at[slot]
+            with self._lock:
+                self._in_flight = None
+                if self.preview:
+                    self._preview_ready = slot
+                if self._pending is not None and self._running:
+                    self._send(self._pending)
+                    self._pending = None
+
+            self.metrics.inference_times.append(seconds)
+            self.metrics.frames_processed += 1
+            if self.profiler.enabled:
+                detect_stage.add(time.perf_counter_ns() - int(seconds * 1e9), int(seconds * 1e9))
+            if code != NO_DIRECTION:
+                self.metrics.directions_published += 1
+                if self._directions.put((captured_at, DIRECTIONS[code])):
+                    self.metrics.directions_dropped += 1
+
+    def poll_direction(self):
+        """Return the latest unread Direction, or None. Never blocks on inference."""
+        item = self._directions.take()
+        if item is None:
+            return None
+        captured_at, gesture = item
+        self.metrics.record_latency(time.perf_counter() - captured_at)
+        return gesture
+
+    def poll_frame(self):
+        """
+        Return the latest processed (flipped) frame for display, or None. The frame
+        is a view into shared memory that stays valid until the next poll_frame().
+        """
+        with self._lock:
+            if self._preview_ready is None:
+                return None
+            self._preview_held = self._preview_ready
+            self._preview_ready = None
+            return self.ring.frames[self._preview_held]
+
+    def timing_summary(self):
+        """The worker's GestureDetector.timing_summary(), available after stop()."""
+        return self._timing
+
+    def stop(self):
+        self._running = False
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            if thread.name == 'gesture-capture':
+                thread.join(timeout=1.0)
+        with self._lock:
+            if self._requests is not None:
+                try:
+                    self._requests.send(None)
+                except OSError:
+                    pass
+        for thread in threads:
+            thread.join(timeout=2.0)
+        self._shutdown()
+
+    def _shutdown(self):
+        if self.process is not None:
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        for connection in (self._requests, self._results):
+            if connection is not None:
+                connection.close()
+        self._requests = self._results = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None